@@ -1,6 +1,7 @@
 import streamlit as st
 from datetime import datetime
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 
 # Load environment
@@ -9,9 +10,16 @@ load_dotenv()
 # Import modules
 from config import Config
 from modules.weather_api import WeatherAPI
+from modules.forecast_frame import ForecastFrame
 from modules.ui_manager import UIManager
 from modules.theme_manager import ThemeManager
 from modules.map_manager import MapManager
+from modules.prefetch_scheduler import PrefetchScheduler
+from modules.tile_proxy import TileProxy
+from modules.gazetteer import Gazetteer
+from modules.history_store import HistoryStore
+from modules.html_renderer import escape
+from modules import ui_templates as templates
 
 # Initialize
 weather_api = WeatherAPI()
@@ -19,6 +27,19 @@ ui = UIManager()
 theme_manager = ThemeManager()
 map_manager = MapManager()
 
+# Session state key for each upstream endpoint
+DATA_ENDPOINTS = {
+    'weather_data': 'weather',
+    'forecast_data': 'forecast',
+    'air_quality_data': 'air_pollution',
+}
+
+# Process-wide scheduler that keeps Popular Cities and favorites warm
+prefetcher = PrefetchScheduler.start_default(weather_api) if Config.ENABLE_PREFETCH else None
+
+# Local map tile endpoint, pre-seeded around Popular Cities and favorites
+tile_proxy = TileProxy.start_default() if Config.TILE_PROXY_ENABLED else None
+
 # Page config
 st.set_page_config(
     page_title=Config.APP_NAME,
@@ -34,7 +55,7 @@ st.set_page_config(
         **Features:**
         • Real-time weather data
         • 7-hour & 7-day forecasts
-        • Interactive temperature charts
+        • Interactive weather trend charts
         • Location maps
         • Air quality monitoring
         • Customizable settings
@@ -44,9 +65,6 @@ st.set_page_config(
     }
 )
 
-# Apply theme
-st.markdown(theme_manager.get_css(), unsafe_allow_html=True)
-
 # Initialize session state - sidebar_visibility کو یقینی بنائیں
 def init_session_state():
     """Initialize all session state variables"""
@@ -63,8 +81,11 @@ def init_session_state():
         'air_quality_data': None,
         'forecast_data': None,
         'last_update': None,
+        'data_fetched_at': {},
+        'revalidation': {},
         'search_history': [],
         'favorites': [],
+        'favorite_coords': {},
         'unit': "metric",
         'theme': "Auto",
         'show_charts': True,
@@ -84,6 +105,39 @@ def init_session_state():
 
 init_session_state()
 
+# Styling goes out before the weather fetch so a cold load isn't unstyled
+# while it waits; only the background depends on the conditions
+theme_manager.inject(st.session_state.theme)
+
+if prefetcher:
+    # Favorites saved with coordinates skip the scheduler's name lookup
+    for name in st.session_state.favorites:
+        if name in st.session_state.favorite_coords:
+            prefetcher.track_location(name, *st.session_state.favorite_coords[name])
+        else:
+            prefetcher.track([name])
+    prefetcher.track_location(st.session_state.address, st.session_state.lat, st.session_state.lon)
+
+if tile_proxy:
+    tile_proxy.seed_names(st.session_state.favorites)
+    tile_proxy.seed_point(st.session_state.lat, st.session_state.lon)
+
+def saved_places():
+    """(name, lat, lon) for the current location, favorites, recent searches and Popular Cities"""
+    places = {st.session_state.address: (st.session_state.lat, st.session_state.lon)}
+    # Favorites keep the coordinates they were saved with, so geocoded ones plot too
+    places.update(st.session_state.favorite_coords)
+    names = st.session_state.favorites + st.session_state.search_history + Config.POPULAR_CITIES
+    
+    gazetteer = Gazetteer.default()
+    for name in names:
+        if name not in places:
+            match = gazetteer.resolve(name)
+            if match:
+                places[name] = (match[0], match[1])
+    
+    return [(name, lat, lon) for name, (lat, lon) in places.items()]
+
 def update_location(search_query):
     """Update location and fetch weather"""
     try:
@@ -95,7 +149,10 @@ def update_location(search_query):
             st.session_state.address = address
             st.session_state.location = search_query
             
-            # Clear cached data
+            # Data for the previous city is not a valid stale value for the new
+            # one, so clear it; the shared cache usually makes this refetch instant
+            st.session_state.revalidation = {}
+            st.session_state.data_fetched_at = {}
             st.session_state.weather_data = None
             st.session_state.hourly_data = None
             st.session_state.daily_data = None
@@ -117,35 +174,52 @@ def update_location(search_query):
     except Exception as e:
         st.error(f"Error updating location: {str(e)}")
 
+def set_weather_data(key, data):
+    """Store one endpoint's data in session state and derive the forecast views"""
+    if key == 'forecast_data':
+        # Keep only the compact columnar frame, not the raw JSON, per session
+        data = ForecastFrame.from_response(data)
+    
+    st.session_state[key] = data
+    if data is None or weather_api.is_sample(data):
+        # Failed fetches count as stale, so the next refresh retries them
+        st.session_state.data_fetched_at.pop(key, None)
+    else:
+        st.session_state.data_fetched_at[key] = datetime.now()
+    
+    if key == 'weather_data' and data:
+        # Log the observation for the trends chart
+        HistoryStore.default().record(st.session_state.lat, st.session_state.lon, data)
+    
+    if key in ('forecast_data', 'weather_data') and st.session_state.forecast_data:
+        # 7-hour forecast, re-anchored whenever a new current observation arrives
+        st.session_state.hourly_data = weather_api.get_7_hour_forecast(
+            st.session_state.forecast_data, st.session_state.weather_data
+        )
+    
+    if key == 'forecast_data' and data:
+        # 7-day forecast
+        st.session_state.daily_data = weather_api.get_daily_forecast_data(data)
+
 def fetch_weather_data():
     """Fetch all weather data"""
     if not st.session_state.weather_data:
         try:
             with st.spinner("🌤️ Loading weather data..."):
-                # Current weather
-                st.session_state.weather_data = weather_api.get_current_weather(
-                    st.session_state.lat, st.session_state.lon
-                )
-                
-                # Forecast
-                st.session_state.forecast_data = weather_api.get_forecast(
-                    st.session_state.lat, st.session_state.lon
-                )
+                lat, lon = st.session_state.lat, st.session_state.lon
                 
-                if st.session_state.forecast_data:
-                    # 7-hour forecast
-                    st.session_state.hourly_data = weather_api.get_7_hour_forecast(
-                        st.session_state.forecast_data
-                    )
-                    # 7-day forecast
-                    st.session_state.daily_data = weather_api.get_daily_forecast_data(
-                        st.session_state.forecast_data
-                    )
-                
-                # Air quality
-                st.session_state.air_quality_data = weather_api.get_air_quality(
-                    st.session_state.lat, st.session_state.lon
-                )
+                # Issue current weather, forecast and air quality at once so a
+                # cold load costs the slowest call rather than the sum of all three
+                with ThreadPoolExecutor(max_workers=3) as executor:
+                    futures = {
+                        executor.submit(weather_api.get_current_weather, lat, lon): 'weather_data',
+                        executor.submit(weather_api.get_forecast, lat, lon): 'forecast_data',
+                        executor.submit(weather_api.get_air_quality, lat, lon): 'air_quality_data',
+                    }
+                    
+                    # Session state is only touched from the script thread
+                    for future in as_completed(futures):
+                        set_weather_data(futures[future], future.result())
                 
                 st.session_state.last_update = datetime.now()
                 
@@ -156,17 +230,52 @@ def fetch_weather_data():
             st.session_state.hourly_data = weather_api._get_7_hour_sample_data()
             st.session_state.daily_data = weather_api._get_sample_daily_data()
 
+def revalidate_weather_data():
+    """Keep showing current data and refetch what is missing or past its freshness window"""
+    now = datetime.now()
+    fetched_at = st.session_state.data_fetched_at
+    pending = st.session_state.revalidation
+    
+    for key, endpoint in DATA_ENDPOINTS.items():
+        if key in pending:
+            continue
+        age = (now - fetched_at[key]).total_seconds() if key in fetched_at else None
+        if age is None or age >= Config.FRESHNESS[endpoint]:
+            pending[key] = weather_api.fetch_async(endpoint, st.session_state.lat, st.session_state.lon)
+    
+    return bool(pending)
+
+def apply_revalidated_data():
+    """Swap in any background results that have arrived"""
+    pending = st.session_state.revalidation
+    
+    for key, future in list(pending.items()):
+        if not future.done():
+            continue
+        del pending[key]
+        try:
+            set_weather_data(key, future.result())
+            st.session_state.last_update = datetime.now()
+        except Exception as e:
+            # Keep showing the last-known data
+            print(f"Revalidation error for {key}: {str(e)}")
+
+def poll_revalidation():
+    """Rerun the app as soon as a background revalidation finishes"""
+    pending = st.session_state.get('revalidation') or {}
+    if any(future.done() for future in pending.values()):
+        st.rerun()
+
+if hasattr(st, 'fragment'):
+    poll_revalidation = st.fragment(run_every=1)(poll_revalidation)
+
 def display_sidebar():
     """Display sidebar with settings and features"""
     with st.sidebar:
         # Sidebar header with toggle button
         col1, col2 = st.columns([4, 1])
         with col1:
-            st.markdown(f"""
-            <div style="text-align: center; padding: 10px 0 20px 0;">
-                <h3 style="color: {Config.COLORS['primary']}; margin: 0;">⚙️ Settings</h3>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(templates.SIDEBAR_HEADER.substitute(title='⚙️ Settings'), unsafe_allow_html=True)
         with col2:
             if st.button("✕", key="close_sidebar", help="Close sidebar"):
                 st.session_state.sidebar_visibility = "collapsed"
@@ -210,7 +319,7 @@ def display_sidebar():
                 st.session_state.theme = selected_theme
                 st.session_state.show_charts = show_charts
                 st.session_state.show_maps = show_maps
-                st.session_state.weather_data = None
+                revalidate_weather_data()
                 st.success("✅ Settings saved!")
                 st.rerun()
             st.markdown('</div>', unsafe_allow_html=True)
@@ -240,6 +349,7 @@ def display_sidebar():
                         if st.button("🗑️", key=f"remove_{fav}"):
                             favorites.remove(fav)
                             st.session_state.favorites = favorites
+                            st.session_state.favorite_coords.pop(fav, None)
                             st.success(f"Removed {fav}")
                             st.rerun()
             else:
@@ -250,6 +360,7 @@ def display_sidebar():
                 if current_address and current_address not in favorites:
                     favorites.append(current_address)
                     st.session_state.favorites = favorites
+                    st.session_state.favorite_coords[current_address] = (st.session_state.lat, st.session_state.lon)
                     st.success(f"Added {current_address} to favorites!")
                     st.rerun()
             
@@ -289,21 +400,15 @@ def main():
     with col2:
         # Current time display
         current_time = datetime.now().strftime('%I:%M %p')
-        st.markdown(f"""
-        <div style="text-align: right; padding: 20px 0;">
-            <p style="color: {Config.COLORS['text_secondary']}; margin: 0; font-size: 16px; font-weight: 500;">
-                ⏰ {current_time}
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(templates.CLOCK.substitute(time=current_time), unsafe_allow_html=True)
     
     # Search section
     search_query = ui.display_search_section()
     
     # Check for quick location
-    if hasattr(st.session_state, 'quick_location'):
-        update_location(st.session_state.quick_location)
-        del st.session_state.quick_location
+    # Popped first: update_location reruns the script and never returns
+    if 'quick_location' in st.session_state:
+        update_location(st.session_state.pop('quick_location'))
     
     # Check for search
     if search_query:
@@ -314,10 +419,20 @@ def main():
         st.info("📍 Please use search to find locations.")
         del st.session_state.use_current_location
     
-    # Fetch weather data
+    # Fetch weather data, swapping in any background revalidation results
+    apply_revalidated_data()
     fetch_weather_data()
     
+    # Background once the conditions are known, so the first one sent already matches
+    theme_manager.inject_background(st.session_state.weather_data, st.session_state.address)
+    
     if st.session_state.get('weather_data'):
+        # Age of the data on screen
+        ui.display_data_age(
+            st.session_state.data_fetched_at.get('weather_data'),
+            refreshing=bool(st.session_state.revalidation)
+        )
+        
         # Current weather section
         ui.display_current_weather(
             st.session_state.weather_data, 
@@ -332,9 +447,14 @@ def main():
         if st.session_state.daily_data:
             ui.display_daily_forecast(st.session_state.daily_data)
         
-        # Temperature chart
+        # Trends chart: full forecast plus logged history
         if st.session_state.get('show_charts', True) and st.session_state.hourly_data:
-            ui.display_temperature_chart(st.session_state.hourly_data)
+            ui.display_trend_chart(
+                st.session_state.forecast_data or st.session_state.hourly_data,
+                st.session_state.lat,
+                st.session_state.lon,
+                st.session_state.theme
+            )
         
         # Air quality
         if st.session_state.air_quality_data:
@@ -343,11 +463,32 @@ def main():
         # Map
         if st.session_state.get('show_maps', True):
             try:
-                map_manager.display_map(
-                    st.session_state.lat,
-                    st.session_state.lon,
-                    st.session_state.get('address', '')
+                map_mode = st.radio(
+                    "Map",
+                    ["📍 This location", "🌐 All my places"],
+                    horizontal=True,
+                    label_visibility="collapsed",
+                    key="map_mode"
                 )
+                if map_mode == "🌐 All my places":
+                    map_manager.display_places_map(weather_api, saved_places())
+                else:
+                    overlay = st.radio(
+                        "Overlay",
+                        ["None", "🌡️ Temperature", "🌧️ Precipitation"],
+                        horizontal=True,
+                        key="map_overlay"
+                    )
+                    # The overlay's sample grid is laid out for this zoom
+                    zoom = st.slider("Zoom", *Config.MAP_ZOOM_RANGE, value=Config.MAP_ZOOM, key="map_zoom")
+                    map_manager.display_map(
+                        st.session_state.lat,
+                        st.session_state.lon,
+                        st.session_state.get('address', ''),
+                        weather_api=weather_api,
+                        field={"🌡️ Temperature": 'temp', "🌧️ Precipitation": 'precip'}.get(overlay),
+                        zoom=zoom
+                    )
             except Exception as e:
                 st.error(f"Map error: {str(e)}")
                 st.info(f"**📍 Location:** {st.session_state.get('address', 'Unknown')}")
@@ -360,8 +501,10 @@ def main():
         
         with col1:
             if st.button("🔄 Refresh Data", use_container_width=True, type="primary"):
-                st.session_state.weather_data = None
-                st.rerun()
+                # Stale-while-revalidate: keep the current data on screen
+                if revalidate_weather_data():
+                    st.rerun()
+                st.info("✅ Weather data is already up to date")
         
         with col2:
             if st.button("📱 Share Weather", use_container_width=True):
@@ -387,25 +530,21 @@ def main():
             if st.button("🏠 Use Default Location", use_container_width=True):
                 update_location(Config.DEFAULT_LOCATION)
     
+    # Swap in revalidated data as soon as it arrives
+    if st.session_state.revalidation:
+        poll_revalidation()
+    
     # Footer
     st.markdown("---")
     
     last_update = st.session_state.last_update.strftime('%I:%M %p') if st.session_state.last_update else "Never"
     
-    st.markdown(f"""
-    <div style="text-align: center; padding: 20px 0; color: {Config.COLORS['text_secondary']};">
-        <p style="margin: 0 0 8px 0; font-weight: 500; font-size: 14px;">
-            🌤️ {Config.APP_NAME} v{Config.APP_VERSION} • 
-            Last updated: {last_update} • 
-            Location: {st.session_state.get('address', 'Unknown')}
-        </p>
-        <p style="margin: 0; font-size: 12px; opacity: 0.8;">
-            Powered by OpenWeatherMap API • 
-            <a href="#" style="color: {Config.COLORS['primary']}; text-decoration: none;">Privacy</a> • 
-            <a href="#" style="color: {Config.COLORS['primary']}; text-decoration: none;">Terms</a>
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(templates.FOOTER.substitute(
+        app_name=escape(Config.APP_NAME),
+        version=escape(Config.APP_VERSION),
+        last_update=last_update,
+        location=escape(st.session_state.get('address', 'Unknown'))
+    ), unsafe_allow_html=True)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,113 @@
+"""Compare the selective response decoder with full JSON materialization.
+
+Run from the repository root:
+
+    python benchmarks/bench_decoder.py
+
+Prints, per endpoint, parse time, peak memory while parsing and the size of
+the object that ends up in the shared cache.
+"""
+import json
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.cache_manager import estimate_size
+from modules.response_decoder import decode, orjson
+
+START = 1760000000
+
+
+def sample_forecast():
+    rng = random.Random(0)
+    items = []
+    for i in range(40):
+        temp = rng.uniform(20, 32)
+        items.append({
+            'dt': START + i * 10800,
+            'main': {
+                'temp': temp, 'feels_like': temp + 1, 'temp_min': temp - 1, 'temp_max': temp + 1,
+                'pressure': 1008, 'sea_level': 1008, 'grnd_level': 1006, 'humidity': rng.randint(40, 90),
+                'temp_kf': 0.5,
+            },
+            'weather': [{'id': 803, 'main': 'Clouds', 'description': 'broken clouds', 'icon': '04d'}],
+            'clouds': {'all': rng.randint(0, 100)},
+            'wind': {'speed': rng.uniform(0, 8), 'deg': rng.randint(0, 359), 'gust': rng.uniform(0, 12)},
+            'visibility': 10000,
+            'pop': rng.random(),
+            'rain': {'3h': rng.uniform(0, 3)},
+            'sys': {'pod': 'd'},
+            'dt_txt': '2025-10-09 09:00:00',
+        })
+    return {
+        'cod': '200', 'message': 0, 'cnt': 40, 'list': items,
+        'city': {
+            'id': 1275339, 'name': 'Mumbai', 'coord': {'lat': 19.076, 'lon': 72.8777}, 'country': 'IN',
+            'population': 12691836, 'timezone': 19800, 'sunrise': START, 'sunset': START + 43200,
+        },
+    }
+
+
+def sample_current_weather():
+    return {
+        'coord': {'lon': 72.88, 'lat': 19.08},
+        'weather': [{'id': 804, 'main': 'Clouds', 'description': 'overcast clouds', 'icon': '04d'}],
+        'base': 'stations',
+        'main': {
+            'temp': 26.99, 'feels_like': 27.0, 'temp_min': 26.94, 'temp_max': 26.99,
+            'pressure': 1001, 'humidity': 89, 'sea_level': 1001, 'grnd_level': 1000,
+        },
+        'visibility': 8000,
+        'wind': {'speed': 4.63, 'deg': 230, 'gust': 6.1},
+        'clouds': {'all': 100},
+        'dt': START,
+        'sys': {'type': 1, 'id': 9052, 'country': 'IN', 'sunrise': START - 20000, 'sunset': START + 20000},
+        'timezone': 19800, 'id': 1275339, 'name': 'Mumbai', 'cod': 200,
+    }
+
+
+def sample_air_quality():
+    return {
+        'coord': {'lon': 72.88, 'lat': 19.08},
+        'list': [{
+            'main': {'aqi': 3},
+            'components': {'co': 400.5, 'no': 0.1, 'no2': 12.3, 'o3': 60.1, 'so2': 8.2,
+                           'pm2_5': 30.4, 'pm10': 55.0, 'nh3': 4.1},
+            'dt': START,
+        }],
+    }
+
+
+def measure(fn, content, repeat):
+    seconds = min(timeit.repeat(lambda: fn(content), number=repeat, repeat=5)) / repeat
+
+    tracemalloc.start()
+    result = fn(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return seconds * 1e6, peak, estimate_size(result)
+
+
+def main():
+    payloads = {
+        'weather': sample_current_weather(),
+        'forecast': sample_forecast(),
+        'air_pollution': sample_air_quality(),
+    }
+
+    print(f"JSON parser: {'orjson' if orjson else 'json (install orjson for faster parsing)'}")
+    print(f"{'endpoint':<14} {'path':<10} {'parse us':>10} {'peak KB':>10} {'cached KB':>10}")
+    for endpoint, payload in payloads.items():
+        content = json.dumps(payload).encode()
+        for label, fn in (('full', json.loads), ('selective', lambda c: decode(endpoint, c))):
+            micros, peak, retained = measure(fn, content, repeat=200)
+            print(f"{endpoint:<14} {label:<10} {micros:>10.1f} {peak / 1024:>10.1f} {retained / 1024:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Compare the column-based forecast layout with the single-grid renderer.
+
+Run from the repository root:
+
+    python benchmarks/bench_forecast_render.py
+
+Runs each layout as a Streamlit script under AppTest and prints script time
+per rerun, the number of delta messages (one per element or container) and
+their total protobuf payload size.
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SETUP = f"""
+import sys
+sys.path.insert(0, {ROOT!r})
+import streamlit as st
+from config import Config
+from modules.weather_api import WeatherAPI
+hourly_data = WeatherAPI._get_7_hour_sample_data()
+daily_data = WeatherAPI._get_sample_daily_data()
+"""
+
+# The previous layout: one st.columns cell per hour and 5 columns plus an
+# st.image per day
+COLUMNS_SCRIPT = SETUP + """
+C = Config.COLORS
+st.markdown('<h3>📅 Next 7 Hours</h3>', unsafe_allow_html=True)
+st.markdown('<div class="weather-card">', unsafe_allow_html=True)
+cols = st.columns(7)
+for idx, hour in enumerate(hourly_data[:7]):
+    with cols[idx]:
+        st.markdown(f'''
+        <div style="text-align: center; padding: 15px 10px;">
+            <p style="font-weight: 600; margin: 0 0 15px 0; color: {C['text_primary']}; font-size: 18px;">{hour['time']}</p>
+            <div style="margin: 15px 0;"><img src="https://openweathermap.org/img/wn/{hour['icon']}@2x.png" width="60"></div>
+            <p style="font-size: 24px; margin: 10px 0; color: {C['primary']}; font-weight: 700;">{hour['temp']}°</p>
+            <p style="color: {C['text_secondary']}; margin: 5px 0; font-size: 14px;">{hour['weather']}</p>
+        </div>
+        ''', unsafe_allow_html=True)
+st.markdown('</div>', unsafe_allow_html=True)
+
+st.markdown('<h3>📆 7-Day Forecast</h3>', unsafe_allow_html=True)
+st.markdown('<div class="weather-card">', unsafe_allow_html=True)
+for idx, day in enumerate(daily_data[:7]):
+    col1, col2, col3, col4, col5 = st.columns([1.5, 1.5, 2, 2, 1])
+    with col1:
+        st.markdown(f'<div style="padding: 15px 0;"><p style="font-weight: 700; margin: 0; color: {C["text_primary"]}; font-size: 18px;">{day["day"]}</p></div>', unsafe_allow_html=True)
+    with col2:
+        st.image(f"https://openweathermap.org/img/wn/{day['icon']}@2x.png", width=60)
+    with col3:
+        st.markdown(f'<div style="padding: 15px 0;"><p style="font-weight: 600; margin: 0; color: {C["text_primary"]}; font-size: 18px;">{day["weather"]}</p></div>', unsafe_allow_html=True)
+    with col4:
+        st.markdown(f'''
+        <div style="padding: 15px 0;">
+            <p style="font-size: 22px; font-weight: 700; margin: 0; color: {C['primary']};">{day['temp']}°C</p>
+            <p style="color: {C['text_secondary']}; margin: 5px 0 0 0; font-size: 14px;">H: {day['max_temp']}° • L: {day['min_temp']}°</p>
+        </div>
+        ''', unsafe_allow_html=True)
+    with col5:
+        st.markdown(f'<div style="padding: 15px 0; text-align: center;"><p style="margin: 0;">🌧️ {day["precipitation"]}%</p></div>', unsafe_allow_html=True)
+    if idx < 6:
+        st.markdown('<hr style="margin: 15px 0; border-color: rgba(0,0,0,0.1);">', unsafe_allow_html=True)
+st.markdown('</div>', unsafe_allow_html=True)
+"""
+
+GRID_SCRIPT = SETUP + """
+from modules.ui_manager import UIManager
+UIManager.display_7_hour_forecast(hourly_data)
+UIManager.display_daily_forecast(daily_data)
+"""
+
+
+def walk(node):
+    yield node
+    for child in getattr(node, 'children', {}).values():
+        yield from walk(child)
+
+
+def measure(script, repeat):
+    app = AppTest.from_string(script, default_timeout=60)
+    app.run()
+    seconds = min(timeit.repeat(app.run, number=1, repeat=repeat))
+
+    nodes = [node for node in walk(app._tree) if getattr(node, 'proto', None) is not None]
+    payload = sum(node.proto.ByteSize() for node in nodes)
+    return seconds * 1000, len(nodes), payload
+
+
+def main():
+    print(f"{'layout':<10} {'rerun ms':>10} {'deltas':>8} {'payload KB':>12}")
+    for label, script in (('columns', COLUMNS_SCRIPT), ('grid', GRID_SCRIPT)):
+        millis, deltas, payload = measure(script, repeat=20)
+        print(f"{label:<10} {millis:>10.1f} {deltas:>8} {payload / 1024:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
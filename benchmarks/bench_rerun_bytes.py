@@ -0,0 +1,49 @@
+"""Measure how many bytes of element deltas each rerun of the app sends.
+
+Run from the repository root:
+
+    python benchmarks/bench_rerun_bytes.py
+
+Runs app.py under AppTest. The first run is a new session and the later runs
+are reruns of that session. For each run it prints the delta count and the
+total protobuf payload, both overall and for markdown/HTML elements alone.
+Upstream calls fall back to sample data when no API key is configured.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+
+def walk(node):
+    yield node
+    for child in getattr(node, 'children', {}).values():
+        yield from walk(child)
+
+
+def payload(app):
+    nodes = [node for node in walk(app._tree) if getattr(node, 'proto', None) is not None]
+    markup = [node for node in nodes if type(node).__name__ in ('Markdown', 'IFrame', 'UnknownElement')]
+    return (
+        len(nodes),
+        sum(node.proto.ByteSize() for node in nodes),
+        sum(node.proto.ByteSize() for node in markup),
+    )
+
+
+def main(reruns=3):
+    app = AppTest.from_file(APP, default_timeout=60)
+    print(f"{'run':<10} {'deltas':>8} {'total KB':>10} {'markup KB':>10}")
+    for run in range(reruns + 1):
+        app.run()
+        deltas, total, markup = payload(app)
+        label = 'first' if run == 0 else f'rerun {run}'
+        print(f"{label:<10} {deltas:>8} {total / 1024:>10.1f} {markup / 1024:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Measure the trends chart as the logged history grows.
+
+Run from the repository root:
+
+    python benchmarks/bench_trend_chart.py
+
+Fills a temporary history store with one observation every 10 minutes for
+each history length. It then times three things: a cold build (read rows,
+LTTB downsample, build figure, serialize), a warm rerun (revision query plus
+cache hit), and the figure validation st.plotly_chart does on every render.
+It also prints the JSON size sent to the browser.
+"""
+import json
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import plotly.tools
+from modules.chart_pipeline import ChartPipeline
+from modules.history_store import HistoryStore
+from modules.weather_api import WeatherAPI
+
+LAT, LON = 31.5497, 74.3436
+STEP = 600
+
+
+def fill(store, count, end):
+    rng = np.random.default_rng(0)
+    rows = []
+    for idx in range(count):
+        dt = end - (count - idx) * STEP
+        temp = 20 + 8 * np.sin(dt / 86400 * 2 * np.pi) + rng.normal()
+        rows.append({'dt': dt, 'main': {'temp': temp, 'humidity': 40 + 30 * rng.random()},
+                     'wind': {'speed': 6 * rng.random()}})
+    for row in rows:
+        store.record(LAT, LON, row)
+
+
+def main():
+    forecast = WeatherAPI._get_7_hour_sample_data()
+    end = int(forecast.dt[0])
+
+    print(f"{'history':>10} {'points':>8} {'cold ms':>9} {'warm ms':>9} {'render ms':>10} {'json KB':>8}")
+    for days in (1, 7, 30, 90, 180):
+        count = days * 86400 // STEP
+        with tempfile.TemporaryDirectory() as tmp:
+            store = HistoryStore(os.path.join(tmp, 'history.sqlite3'), retention=400 * 86400)
+            fill(store, count, end)
+            pipeline = ChartPipeline()
+            pipeline._figures.clear()
+
+            def chart():
+                key = ChartPipeline.data_key(store.revision(LAT, LON), forecast)
+                return pipeline.figure_json(key, lambda: (store.series(LAT, LON, since=0), forecast))
+
+            cold = timeit.timeit(chart, number=1) * 1000
+            warm = min(timeit.repeat(chart, number=20, repeat=3)) / 20 * 1000
+            figure = chart()
+            render = min(timeit.repeat(
+                lambda: plotly.tools.return_figure_from_figure_or_data(json.loads(figure), validate_figure=True),
+                number=5, repeat=3)) / 5 * 1000
+
+        print(f"{days:>8} d {count:>8} {cold:>9.1f} {warm:>9.2f} {render:>10.1f} {len(figure) / 1024:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -13,10 +13,19 @@ class Config:
     DEFAULT_LOCATION = "Mumbai, India"
     DEFAULT_LAT = 19.0760
     DEFAULT_LON = 72.8777
+    POPULAR_CITIES = ["Karachi", "Lahore", "Islamabad", "Mumbai", "Delhi", "Dubai", "London", "New York"]
     
-    # Background Image URL
+    # Background Image URL (used until the local variants below are built)
     BACKGROUND_IMAGE = "https://images.unsplash.com/photo-1506905925346-21bda4d32df4?w=1920&q=80"
     
+    # Local backgrounds, resized and re-encoded into STATIC_DIR by
+    # scripts/build_assets.py (or in the background on first start)
+    BACKGROUND_SOURCE_DIR = "assests/backgrounds"
+    BACKGROUND_WIDTHS = (640, 1280, 1920)
+    BACKGROUND_QUALITY = {'avif': 50, 'webp': 72}
+    STATIC_DIR = "static"
+    STATIC_URL = "app/static"      # where Streamlit serves STATIC_DIR
+    
     # Colors (Modern Design)
     COLORS = {
         'primary': '#1a73e8',      # Blue
@@ -32,13 +41,168 @@ class Config:
         'card_bg': 'rgba(255, 255, 255, 0.95)',
     }
     
+    # Sidebar themes, compiled into CSS variables ("Auto" follows the OS setting)
+    THEMES = {
+        'Light': {
+            'primary': COLORS['primary'],
+            'secondary': COLORS['secondary'],
+            'warning': COLORS['warning'],
+            'text-primary': COLORS['text_primary'],
+            'text-secondary': COLORS['text_secondary'],
+            'card-bg': COLORS['card_bg'],
+            'tile-bg': 'rgba(26, 115, 232, 0.05)',
+            'panel-bg': 'rgba(255, 255, 255, 0.9)',
+            'border': 'rgba(0, 0, 0, 0.08)',
+            'separator': 'rgba(0, 0, 0, 0.1)',
+            'overlay': 'rgba(255, 255, 255, 0.92)',
+            'shadow': 'rgba(0, 0, 0, 0.12)',
+            'rain-bg': 'rgba(52, 168, 83, 0.15)',
+        },
+        'Dark': {
+            'primary': '#8ab4f8',
+            'secondary': '#81c995',
+            'warning': '#fdd663',
+            'text-primary': '#e8eaed',
+            'text-secondary': '#bdc1c6',
+            'card-bg': 'rgba(32, 33, 36, 0.92)',
+            'tile-bg': 'rgba(138, 180, 248, 0.08)',
+            'panel-bg': 'rgba(32, 33, 36, 0.9)',
+            'border': 'rgba(255, 255, 255, 0.12)',
+            'separator': 'rgba(255, 255, 255, 0.12)',
+            'overlay': 'rgba(18, 18, 18, 0.88)',
+            'shadow': 'rgba(0, 0, 0, 0.4)',
+            'rain-bg': 'rgba(129, 201, 149, 0.15)',
+        },
+        'High Contrast': {
+            'primary': '#0038a8',
+            'secondary': '#006400',
+            'warning': '#7a4f00',
+            'text-primary': '#000000',
+            'text-secondary': '#000000',
+            'card-bg': '#ffffff',
+            'tile-bg': '#ffffff',
+            'panel-bg': '#ffffff',
+            'border': '#000000',
+            'separator': '#000000',
+            'overlay': 'rgba(255, 255, 255, 0.98)',
+            'shadow': 'rgba(0, 0, 0, 0)',
+            'rain-bg': '#ffffff',
+        },
+    }
+    
+    # HTTP Settings
+    HTTP_TIMEOUT = 10
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+    HTTP_MAX_RETRIES = 3
+    HTTP_BACKOFF_FACTOR = 0.5
+    HTTP_BACKOFF_JITTER = 0.25
+    BATCH_MAX_CONCURRENCY = 16     # keep at or below HTTP_POOL_SIZE to reuse connections
+    
+    # How long session data counts as fresh, following OpenWeather's update
+    # cadence (current conditions ~10 min, 5-day forecast every 3 h)
+    FRESHNESS = {
+        'weather': 600,
+        'forecast': 3 * 3600,
+        'air_pollution': 3600,
+    }
+    
+    # Upstream rate limit (OpenWeather free tier allows 60 calls/minute)
+    RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
+    RATE_LIMIT_BURST = 10
+    RATE_LIMIT_MAX_WAIT = 30       # seconds a call may queue before giving up
+    
+    # How long a caller waits on someone else's request: every attempt queues
+    # for its own token, so followers never give up before the leader does
+    SINGLE_FLIGHT_TIMEOUT = (RATE_LIMIT_MAX_WAIT + HTTP_TIMEOUT) * (HTTP_MAX_RETRIES + 1)
+    
+    # Cache Settings (shared by every session in the process)
+    CACHE_GRID_DEGREES = 0.01      # ~1 km; nearby lookups share an entry
+    CACHE_MAX_BYTES = 64 * 1024 * 1024
+    CACHE_TTL = {
+        'weather': 600,            # current conditions refresh every ~10 min
+        'forecast': 1800,
+        'air_pollution': 1800,
+    }
+    
+    # Background prefetch of Popular Cities and favorites
+    ENABLE_PREFETCH = True
+    PREFETCH_INTERVAL = 60             # seconds between passes
+    PREFETCH_LEAD_TIME = 120           # refresh entries this close to expiry
+    PREFETCH_BUDGET_PER_MINUTE = 20    # upstream calls the scheduler may spend
+    PREFETCH_JITTER = 15
+    PREFETCH_FORGET_AFTER = 6 * 3600   # stop refreshing favorites nobody has opened
+    
+    # Geocoding Cache (persists across restarts)
+    GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", ".cache/geocode.sqlite3")
+    GEOCODE_TTL = 30 * 24 * 3600
+    GEOCODE_NEGATIVE_TTL = 3600
+    
+    # Offline Gazetteer
+    GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", "data/cities.tsv")
+    GAZETTEER_COUNTRIES_PATH = "data/countries.tsv"
+    GAZETTEER_MAX_SUGGESTIONS = 8
+    
+    # Weather icons, downloaded once and inlined as a CSS sprite. Point
+    # ICON_BASE_URL at a local mirror to avoid openweathermap.org entirely
+    ICON_BASE_URL = os.getenv("ICON_BASE_URL", "https://openweathermap.org/img/wn")
+    ICON_SCALE = '2x'
+    ICON_CACHE_MAX_ENTRIES = 64
+    ICON_RETRY_AFTER = 300
+    
+    # Rendered HTML sections (shared by every session in the process)
+    HTML_CACHE_TTL = 3600
+    HTML_CACHE_MAX_BYTES = 8 * 1024 * 1024
+    
+    # Trend charts: observed history is logged per location and plotted with
+    # the forecast, downsampled so cost doesn't grow with the history length
+    HISTORY_PATH = os.getenv("HISTORY_PATH", ".cache/history.sqlite3")
+    HISTORY_RETENTION = 180 * 24 * 3600
+    CHART_PIXEL_BUDGET = 800           # points per trace, about one per horizontal pixel
+    CHART_WEBGL_THRESHOLD = 500        # longer traces render with WebGL
+    CHART_PANEL_HEIGHT = 170
+    CHART_CACHE_TTL = 3600
+    CHART_CACHE_MAX_BYTES = 16 * 1024 * 1024
+    
     # Weather Settings
     UNITS = 'metric'
     LANGUAGE = 'en'
     
     # Map Settings
     MAP_ZOOM = 11
+    MAP_ZOOM_RANGE = (5, 15)           # zoom slider under the location map
     MAP_TILE = 'CartoDB positron'
+    MAP_HEIGHT = 500
+    MAP_CACHE_TTL = 24 * 3600          # rendered map HTML, shared by every session
+    MAP_CACHE_MAX_BYTES = 16 * 1024 * 1024
+    VENDOR_DIR = "static/vendor"       # filled by scripts/fetch_vendor.py
+    PLACES_MAP_FETCH_LIMIT = 10        # uncached places fetched per render of the all-places map
+    
+    # Weather field overlay: point samples on a lattice of coarse map tiles,
+    # interpolated into one image over the location map
+    FIELD_ZOOM_OFFSET = 3              # field tiles are 8x the map's, a handful per view
+    FIELD_SAMPLES_PER_TILE = 2         # lattice cells per tile edge, (n + 1)^2 samples per tile
+    FIELD_TILE_PIXELS = 32             # raster size per tile; the browser smooths the upscale
+    FIELD_VIEWPORT_WIDTH = 1024        # assumed map width in px when picking tiles
+    FIELD_FETCH_LIMIT = 12             # uncached samples fetched per render
+    FIELD_OPACITY = 0.6
+    FIELD_CACHE_MAX_BYTES = 16 * 1024 * 1024
+    
+    # Tile proxy: the browser loads map tiles from a local endpoint backed by
+    # an on-disk cache instead of the tile CDN
+    TILE_PROXY_ENABLED = os.getenv("TILE_PROXY_ENABLED", "0") == "1"
+    TILE_UPSTREAM_URL = os.getenv("TILE_UPSTREAM_URL", "https://{s}.basemaps.cartocdn.com/light_all/{z}/{x}/{y}.png")
+    TILE_UPSTREAM_SUBDOMAINS = "abcd"
+    TILE_ATTRIBUTION = '&copy; OpenStreetMap contributors &copy; CARTO'
+    TILE_PROXY_HOST = os.getenv("TILE_PROXY_HOST", "127.0.0.1")
+    TILE_PROXY_PORT = int(os.getenv("TILE_PROXY_PORT", "8765"))
+    TILE_PROXY_PUBLIC_URL = os.getenv("TILE_PROXY_PUBLIC_URL", "")  # when the browser reaches it elsewhere
+    TILE_CACHE_DIR = ".cache/tiles"
+    TILE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+    TILE_BROWSER_MAX_AGE = 7 * 24 * 3600
+    TILE_MAX_ZOOM = 19
+    TILE_SEED_ZOOM_SPAN = 1            # seed MAP_ZOOM - 1 .. MAP_ZOOM + 1
+    TILE_SEED_RADIUS = 2               # tiles each side of the center, enough for the map viewport
+    TILE_SEED_DELAY = 0.05             # pause between seed fetches to go easy on the upstream
     
     # Features
     ENABLE_HOURLY_FORECAST = True
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import threading
+from config import Config
+
+try:
+    from PIL import Image, features
+except ImportError:  # optional; without Pillow the remote background is used
+    Image = None
+    features = None
+
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+
+
+class AssetPipeline:
+    """Builds resized, content-hashed background variants for Streamlit static serving"""
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, source_dir=None, output_dir=None, widths=None, quality=None):
+        self.source_dir = source_dir or Config.BACKGROUND_SOURCE_DIR
+        self.output_dir = output_dir or os.path.join(Config.STATIC_DIR, 'backgrounds')
+        self.widths = tuple(widths or Config.BACKGROUND_WIDTHS)
+        self.quality = quality or Config.BACKGROUND_QUALITY
+        self.manifest = {}
+        self._thread = None
+
+    @classmethod
+    def default(cls):
+        """Get the process-wide pipeline, building missing variants in the background"""
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    pipeline = cls()
+                    pipeline.load()
+                    if pipeline.is_stale():
+                        pipeline.build_in_background()
+                    cls._default = pipeline
+        return cls._default
+
+    @staticmethod
+    def formats():
+        """Output formats this Pillow build can encode, best first"""
+        if Image is None:
+            return []
+        return [fmt for fmt in ('avif', 'webp') if features.check(fmt)]
+
+    def sources(self):
+        if not os.path.isdir(self.source_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.source_dir)
+            if name.lower().endswith(('.jpg', '.jpeg', '.png'))
+        )
+
+    def _variant_name(self, stem, digest, width, fmt):
+        # The hash covers the source bytes and encoder settings, so a changed
+        # image or setting gets a new URL and old copies never go stale
+        key = f"{digest}:{width}:{fmt}:{self.quality.get(fmt)}".encode()
+        return f"{stem}-{width}w.{hashlib.blake2b(key, digest_size=6).hexdigest()}.{fmt}"
+
+    def load(self):
+        path = os.path.join(self.output_dir, self.MANIFEST)
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+        return self.manifest
+
+    def is_stale(self):
+        """True when a source image or format has no built variants yet"""
+        stems = {os.path.splitext(name)[0] for name in self.sources()}
+        if not stems:
+            return False
+        formats = set(self.formats())
+        return any(set(self.manifest.get(stem, {})) != formats for stem in stems)
+
+    def build(self):
+        """Encode every missing variant and write the manifest"""
+        if Image is None:
+            return {}
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        manifest = {}
+
+        for name in self.sources():
+            stem = os.path.splitext(name)[0]
+            path = os.path.join(self.source_dir, name)
+            with open(path, 'rb') as f:
+                digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+            variants = {}
+            with Image.open(path) as source:
+                source = source.convert('RGB')
+                for fmt in self.formats():
+                    variants[fmt] = {}
+                    for width in self.widths:
+                        if width > source.width:
+                            continue
+                        filename = self._variant_name(stem, digest, width, fmt)
+                        target = os.path.join(self.output_dir, filename)
+                        if not os.path.exists(target):
+                            height = round(source.height * width / source.width)
+                            resized = source.resize((width, height), Image.LANCZOS)
+                            resized.save(target + '.tmp', format=fmt.upper(), quality=self.quality[fmt])
+                            os.replace(target + '.tmp', target)
+                        variants[fmt][str(width)] = filename
+            manifest[stem] = variants
+
+        path = os.path.join(self.output_dir, self.MANIFEST)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(path + '.tmp', path)
+
+        self.manifest = manifest
+        return manifest
+
+    def build_in_background(self):
+        def run():
+            try:
+                self.build()
+            except Exception as e:
+                print(f"Asset build error: {str(e)}")
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=run, name="asset-pipeline", daemon=True)
+            self._thread.start()
+
+    def stems(self, prefix):
+        """Built backgrounds whose name starts with prefix, e.g. 'night'"""
+        return sorted(stem for stem in self.manifest if stem.startswith(prefix))
+
+    def variants(self, stem):
+        """{width: [(url, mime type), ...]} for one background, best format first"""
+        by_width = {}
+        for fmt in ('avif', 'webp'):
+            for width, filename in self.manifest.get(stem, {}).get(fmt, {}).items():
+                url = f"{Config.STATIC_URL}/backgrounds/{filename}"
+                by_width.setdefault(int(width), []).append((url, MIME_TYPES[fmt]))
+        return dict(sorted(by_width.items()))
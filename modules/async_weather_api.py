@@ -0,0 +1,287 @@
+import asyncio
+import threading
+import weakref
+import aiohttp
+from config import Config
+from modules.cache_manager import snap_coordinates
+from modules.gazetteer import Gazetteer
+from modules.geocode_cache import GeocodeCache, normalize_query
+from modules.rate_limiter import INTERACTIVE, PRIORITY_NAMES, RateLimitTimeout, Ticket
+from modules.response_decoder import decode, loads
+from modules.weather_api import WeatherAPI
+
+
+class BackgroundLoop:
+    """Event loop in a daemon thread that Streamlit's script thread can submit work to"""
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, name="weather-async-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def default(cls):
+        """Get the process-wide background loop"""
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls()
+        return cls._default
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Schedule a coroutine and return a concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the loop and block until it finishes"""
+        return self.submit(coro).result(timeout)
+
+
+class AsyncWeatherAPI:
+    """asyncio counterpart of WeatherAPI sharing its caches and connection limits"""
+
+    # Session and in-flight requests by cache key, one set per event loop; aiohttp
+    # sessions and tasks are bound to the loop that created them
+    _loop_state = weakref.WeakKeyDictionary()
+
+    RETRY_STATUSES = WeatherAPI.RETRY_STATUSES
+
+    def __init__(self):
+        self.api_key = Config.OPENWEATHER_API_KEY
+        if not self.api_key:
+            raise ValueError("OpenWeather API key not found. Add it to .env file")
+
+        self.base_url = "https://api.openweathermap.org/data/2.5"
+
+    @classmethod
+    def _state(cls):
+        """Session and in-flight map for the running loop"""
+        loop = asyncio.get_running_loop()
+        state = cls._loop_state.get(loop)
+        if state is None:
+            state = cls._loop_state[loop] = {'session': None, 'inflight': {}}
+        return state
+
+    @classmethod
+    def _get_session(cls):
+        """Get the running loop's shared aiohttp session, creating it on first use"""
+        state = cls._state()
+        if state['session'] is None or state['session'].closed:
+            connector = aiohttp.TCPConnector(limit=Config.HTTP_POOL_SIZE, ttl_dns_cache=300)
+            state['session'] = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=Config.HTTP_TIMEOUT),
+                headers={
+                    'Accept-Encoding': 'gzip, deflate',
+                    'User-Agent': f"{Config.APP_NAME.replace(' ', '')}/{Config.APP_VERSION}"
+                }
+            )
+        return state['session']
+
+    @classmethod
+    async def close(cls):
+        """Close the running loop's shared session"""
+        state = cls._state()
+        if state['session'] is not None and not state['session'].closed:
+            await state['session'].close()
+        state['session'] = None
+
+    async def _acquire(self, priority):
+        """Wait for a token from the rate limiter shared with WeatherAPI without blocking the loop"""
+        # Polls with asyncio.sleep rather than parking a thread per waiting request
+        limiter = WeatherAPI._rate_limiter
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + Config.RATE_LIMIT_MAX_WAIT
+        ticket = Ticket(priority)
+        granted = False
+        try:
+            while True:
+                wait = limiter.try_acquire(ticket)
+                if wait == 0:
+                    granted = True
+                    return
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    limiter.cancel(ticket, timed_out=True)
+                    raise RateLimitTimeout(
+                        f"Waited {Config.RATE_LIMIT_MAX_WAIT}s for an upstream token ({PRIORITY_NAMES[ticket.priority]})"
+                    )
+                await asyncio.sleep(min(wait, remaining))
+        finally:
+            if not granted:
+                limiter.cancel(ticket)
+
+    async def _get_json(self, url, params, decoder=loads, priority=None):
+        """GET a JSON document with bounded, jittered retries"""
+        # With a priority (OpenWeather hosts), every attempt first takes a rate-limiter token
+        session = self._get_session()
+
+        for attempt in range(Config.HTTP_MAX_RETRIES + 1):
+            last_attempt = attempt == Config.HTTP_MAX_RETRIES
+            if priority is not None:
+                await self._acquire(priority)
+            retry_after = None
+            try:
+                async with session.get(url, params=params) as response:
+                    if response.status not in self.RETRY_STATUSES or last_attempt:
+                        response.raise_for_status()
+                        return decoder(await response.read())
+                    retry_after = response.headers.get('Retry-After')
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if last_attempt:
+                    raise
+
+            await asyncio.sleep(WeatherAPI.retry_delay(attempt, retry_after))
+
+    async def _coalesce(self, key, factory):
+        """Share one in-flight coroutine between concurrent callers with the same key"""
+        inflight = self._state()['inflight']
+        task = inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            inflight[key] = task
+            task.add_done_callback(lambda _: inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, endpoint, lat, lon, priority=INTERACTIVE):
+        """Fetch an endpoint through the cache shared with WeatherAPI"""
+        lat, lon = snap_coordinates(lat, lon, Config.CACHE_GRID_DEGREES)
+        key = (endpoint, lat, lon)
+
+        data = WeatherAPI._cache.get(key)
+        if data is not None:
+            return data
+
+        return await self._coalesce(key, lambda: self._fetch_upstream(key, priority))
+
+    async def _fetch_upstream(self, key, priority=INTERACTIVE):
+        endpoint, lat, lon = key
+        params = {
+            'lat': lat,
+            'lon': lon,
+            'appid': self.api_key,
+            **WeatherAPI.ENDPOINT_PARAMS[endpoint]
+        }
+        data = await self._get_json(
+            f"{self.base_url}/{endpoint}", params, lambda content: decode(endpoint, content), priority
+        )
+
+        WeatherAPI._cache.set(key, data, Config.CACHE_TTL[endpoint])
+        return data
+
+    async def get_location_coordinates(self, location_name):
+        """Get coordinates for a location"""
+        try:
+            known = Gazetteer.default().resolve(location_name)
+            if known:
+                return known
+
+            result = await self._coalesce(
+                ('geocode', normalize_query(location_name)),
+                lambda: self._geocode(location_name)
+            )
+            if result:
+                return result
+
+            return Config.DEFAULT_LAT, Config.DEFAULT_LON, Config.DEFAULT_LOCATION
+
+        except Exception as e:
+            print(f"Location error: {str(e)}")
+            return Config.DEFAULT_LAT, Config.DEFAULT_LON, Config.DEFAULT_LOCATION
+
+    async def _geocode(self, location_name):
+        """Resolve a location through the geocode cache, then both providers at once"""
+        geocode_cache = WeatherAPI._geocode_cache
+        cached = geocode_cache.get(location_name)
+        if cached is GeocodeCache.NOT_FOUND:
+            return None
+        if cached:
+            return cached
+
+        pending = {
+            asyncio.ensure_future(self._geocode_openweather(location_name)),
+            asyncio.ensure_future(self._geocode_nominatim(location_name)),
+        }
+        result = None
+        failed = False
+
+        try:
+            while pending and result is None:
+                done, pending = await asyncio.wait(
+                    pending, timeout=Config.HTTP_TIMEOUT, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    print(f"Geocoding timed out for {location_name}")
+                    failed = True
+                    break
+                for task in done:
+                    if task.exception() is not None:
+                        print(f"Geocoding error: {str(task.exception())}")
+                        failed = True
+                    elif task.result() and result is None:
+                        result = task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if result:
+            geocode_cache.set(location_name, *result)
+        elif not failed:
+            geocode_cache.set_not_found(location_name)
+
+        return result
+
+    async def _geocode_openweather(self, location_name):
+        params = {
+            'q': location_name,
+            'limit': 1,
+            'appid': self.api_key
+        }
+        data = await self._get_json("https://api.openweathermap.org/geo/1.0/direct", params, priority=INTERACTIVE)
+        if not data:
+            return None
+
+        name = data[0].get('name', '')
+        country = data[0].get('country', '')
+        address = f"{name}, {country}" if name and country else location_name
+        return data[0]['lat'], data[0]['lon'], address
+
+    async def _geocode_nominatim(self, location_name):
+        params = {
+            'q': location_name,
+            'format': 'json',
+            'limit': 1
+        }
+        data = await self._get_json("https://nominatim.openstreetmap.org/search", params)
+        if not data:
+            return None
+        return float(data[0]['lat']), float(data[0]['lon']), data[0].get('display_name', location_name)
+
+    async def get_current_weather(self, lat, lon, priority=INTERACTIVE):
+        """Get current weather data"""
+        try:
+            return await self._fetch('weather', lat, lon, priority)
+        except Exception as e:
+            print(f"Weather API error: {str(e)}")
+            return WeatherAPI._get_sample_data()
+
+    async def get_forecast(self, lat, lon, priority=INTERACTIVE):
+        """Get 5-day forecast"""
+        try:
+            return await self._fetch('forecast', lat, lon, priority)
+        except Exception:
+            return None
+
+    async def get_air_quality(self, lat, lon, priority=INTERACTIVE):
+        """Get air quality data"""
+        try:
+            return await self._fetch('air_pollution', lat, lon, priority)
+        except Exception:
+            return None
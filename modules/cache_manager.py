@@ -0,0 +1,126 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def snap_coordinates(lat, lon, grid):
+    """Round coordinates onto a grid so nearby lookups share a cache entry"""
+    return round(round(lat / grid) * grid, 6), round(round(lon / grid) * grid, 6)
+
+
+def estimate_size(value):
+    """Approximate memory footprint of a cached value in bytes"""
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes) + sys.getsizeof(value)
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry TTL and a memory bound"""
+
+    def __init__(self, max_bytes, max_entries=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (expires_at, size, value)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, count=False) is not None
+
+    def get(self, key, default=None, count=True):
+        """Return a live entry and mark it recently used"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return default
+
+            expires_at, size, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                if count:
+                    self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            if count:
+                self.hits += 1
+            return value
+
+    def set(self, key, value, ttl):
+        """Store a value for ttl seconds, evicting least recently used entries"""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+            self._data[key] = (time.monotonic() + ttl, size, value)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes or (
+                self.max_entries is not None and len(self._data) > self.max_entries
+            ):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def ttl_remaining(self, key):
+        """Seconds until an entry expires, or None if it is missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            remaining = entry[0] - time.monotonic()
+            return remaining if remaining > 0 else None
+
+    def delete(self, key):
+        """Drop an entry if present"""
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self):
+        """Drop every entry and reset statistics"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self):
+        """Hit, miss and eviction counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+    def _remove(self, key):
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
@@ -0,0 +1,141 @@
+import hashlib
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+from config import Config
+from modules.cache_manager import TTLCache
+
+# (column, axis title, scale) per panel, top to bottom; pop is stored as 0-1
+PANELS = (
+    ('temp', 'Temp (°C)', 1),
+    ('humidity', 'Humidity (%)', 1),
+    ('wind_speed', 'Wind (m/s)', 1),
+    ('pop', 'Rain chance (%)', 100),
+)
+
+
+def lttb(x, y, threshold):
+    """Indices of the Largest-Triangle-Three-Buckets downsample of (x, y) to threshold points"""
+    count = len(x)
+    if threshold >= count or threshold < 3:
+        return np.arange(count)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Bucket edges over the interior points; the first and last are always kept
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = count - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # The next bucket's average stands in for the point not chosen yet
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else count
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample(dt, values, threshold):
+    """(dt, values) without missing readings, reduced to at most threshold points"""
+    keep = ~np.isnan(values)
+    dt, values = dt[keep], values[keep]
+    indices = lttb(dt, values, threshold)
+    return dt[indices], values[indices]
+
+
+class ChartPipeline:
+    """Builds the trends figure once per data revision and serves its JSON from a shared cache"""
+
+    # Figure JSON keyed by a hash of the plotted data, shared by every session
+    _figures = TTLCache(max_bytes=Config.CHART_CACHE_MAX_BYTES)
+
+    def __init__(self, pixel_budget=None, webgl_threshold=None):
+        self.pixel_budget = pixel_budget or Config.CHART_PIXEL_BUDGET
+        self.webgl_threshold = Config.CHART_WEBGL_THRESHOLD if webgl_threshold is None else webgl_threshold
+
+    @staticmethod
+    def data_key(history_revision, forecast, theme='Auto'):
+        """Hash identifying the chart's inputs without reading the history rows"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((history_revision, theme)).encode())
+        if forecast is not None:
+            digest.update(str(forecast.timezone).encode())
+            for name, _, _ in PANELS:
+                digest.update(getattr(forecast, name).tobytes())
+            digest.update(forecast.dt.tobytes())
+        return digest.hexdigest()
+
+    def _trace(self, dt, values, timezone, **style):
+        dt, values = downsample(dt, values, self.pixel_budget)
+        trace = go.Scattergl if len(dt) > self.webgl_threshold else go.Scatter
+        return trace(x=(dt + timezone).astype('datetime64[s]'), y=values, mode='lines', **style)
+
+    @staticmethod
+    def palette(theme):
+        """Chart colors for a sidebar theme; under "Auto" text and grid follow Streamlit's own theme"""
+        colors = Config.THEMES.get(theme, Config.THEMES['Light'])
+        explicit = theme in Config.THEMES
+        return {
+            'observed': colors['primary'],
+            'forecast': colors['secondary'],
+            'text': colors['text-primary'] if explicit else None,
+            'grid': colors['separator'] if explicit else None,
+        }
+
+    def build_figure(self, history, forecast, theme='Auto'):
+        """Observed history (solid) and forecast (dashed) on shared time axes"""
+        timezone = forecast.timezone if forecast is not None else 0
+        colors = self.palette(theme)
+        fig = make_subplots(rows=len(PANELS), cols=1, shared_xaxes=True, vertical_spacing=0.03)
+
+        for row, (name, title, scale) in enumerate(PANELS, start=1):
+            if history is not None and name in history and len(history['dt']):
+                fig.add_trace(self._trace(
+                    history['dt'], history[name] * scale, timezone,
+                    name=f"{title} observed",
+                    line=dict(color=colors['observed'], width=2),
+                ), row=row, col=1)
+
+            if forecast is not None and len(forecast):
+                fig.add_trace(self._trace(
+                    forecast.dt, getattr(forecast, name).astype(np.float64) * scale, timezone,
+                    name=f"{title} forecast",
+                    line=dict(color=colors['forecast'], width=2, dash='dash'),
+                ), row=row, col=1)
+
+            fig.update_yaxes(title_text=title, showgrid=True, gridcolor=colors['grid'], row=row, col=1)
+
+        # Transparent, so the themed card behind the chart shows through
+        fig.update_xaxes(showgrid=True, gridcolor=colors['grid'])
+        fig.update_layout(
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            height=Config.CHART_PANEL_HEIGHT * len(PANELS),
+            font=dict(size=13, color=colors['text']),
+            hovermode='x unified',
+            margin=dict(l=40, r=40, t=30, b=40),
+            showlegend=False
+        )
+        return fig
+
+    def figure_json(self, key, load, theme='Auto'):
+        """Figure JSON for a data key; load() returns (history, forecast) and runs only on a miss"""
+        cached = self._figures.get(key)
+        if cached is None:
+            cached = pio.to_json(self.build_figure(*load(), theme=theme), validate=False)
+            self._figures.set(key, cached, Config.CHART_CACHE_TTL)
+        return cached
+
+    def stats(self):
+        return self._figures.stats()
@@ -0,0 +1,94 @@
+import numpy as np
+
+SECONDS_PER_DAY = 86400
+
+# 1970-01-01 was a Thursday, so epoch day 0 maps to index 3
+DAY_NAMES = np.array(['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'])
+
+
+def forecast_columns(forecast_data):
+    """Pull the fields the daily view needs out of a /forecast response as arrays"""
+    if hasattr(forecast_data, 'columns'):
+        return forecast_data.columns()
+
+    items = forecast_data['list']
+    return {
+        'dt': np.fromiter((item['dt'] for item in items), dtype=np.int64, count=len(items)),
+        'temp': np.fromiter((item['main']['temp'] for item in items), dtype=np.float64, count=len(items)),
+        'pop': np.fromiter((item.get('pop', 0) for item in items), dtype=np.float64, count=len(items)),
+        'weather': np.array([item['weather'][0]['main'] for item in items], dtype=object),
+        'icon': np.array([item['weather'][0]['icon'] for item in items], dtype=object),
+        'timezone': forecast_data.get('city', {}).get('timezone', 0),
+    }
+
+
+def _group_mode(groups, values, n_groups):
+    """Most frequent value per group using one 2-D histogram"""
+    categories, codes = np.unique(values, return_inverse=True)
+    counts = np.zeros((n_groups, len(categories)), dtype=np.int32)
+    np.add.at(counts, (groups, codes), 1)
+    return categories[counts.argmax(axis=1)]
+
+
+def aggregate_daily_many(columns_list, max_days=7):
+    """Aggregate many locations' forecasts into per-local-day summaries in one pass"""
+    if not columns_list:
+        return []
+
+    lengths = np.array([len(columns['dt']) for columns in columns_list])
+    location = np.repeat(np.arange(len(columns_list)), lengths)
+    offsets = np.repeat([columns['timezone'] for columns in columns_list], lengths)
+
+    dt = np.concatenate([columns['dt'] for columns in columns_list])
+    temp = np.concatenate([columns['temp'] for columns in columns_list])
+    pop = np.concatenate([columns['pop'] for columns in columns_list]) * 100
+    weather = np.concatenate([columns['weather'] for columns in columns_list])
+    icon = np.concatenate([columns['icon'] for columns in columns_list])
+
+    if len(dt) == 0:
+        return [[] for _ in columns_list]
+
+    # Bucket by calendar day in each city's own timezone
+    local_day = (dt + offsets) // SECONDS_PER_DAY
+    span = local_day.max() - local_day.min() + 1
+    keys, groups = np.unique(location * span + (local_day - local_day.min()), return_inverse=True)
+    n_groups = len(keys)
+
+    counts = np.bincount(groups, minlength=n_groups)
+    mean_temp = np.bincount(groups, weights=temp, minlength=n_groups) / counts
+
+    order = np.argsort(groups, kind='stable')
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    max_temp = np.maximum.reduceat(temp[order], starts)
+    min_temp = np.minimum.reduceat(temp[order], starts)
+    max_pop = np.maximum.reduceat(pop[order], starts)
+
+    mode_weather = _group_mode(groups, weather, n_groups)
+    mode_icon = _group_mode(groups, icon, n_groups)
+
+    group_location = keys // span
+    group_day = keys % span + local_day.min()
+    dates = np.datetime_as_string(group_day.astype('datetime64[D]'))
+    day_names = DAY_NAMES[(group_day + 3) % 7]
+
+    results = [[] for _ in columns_list]
+    for g in range(n_groups):
+        days = results[group_location[g]]
+        if len(days) >= max_days:
+            continue
+        days.append({
+            'date': str(dates[g]),
+            'day': str(day_names[g]),
+            'temp': int(np.round(mean_temp[g])),
+            'max_temp': int(np.round(max_temp[g])),
+            'min_temp': int(np.round(min_temp[g])),
+            'weather': str(mode_weather[g]),
+            'icon': str(mode_icon[g]),
+            'precipitation': int(np.round(max_pop[g])),
+        })
+    return results
+
+
+def aggregate_daily(forecast_data, max_days=7):
+    """Per-local-day summary for a single /forecast response"""
+    return aggregate_daily_many([forecast_columns(forecast_data)], max_days)[0]
@@ -0,0 +1,110 @@
+import numpy as np
+
+
+class ForecastFrame:
+    """Columnar /forecast data parsed once per response; slices share memory"""
+
+    COLUMNS = ('dt', 'temp', 'humidity', 'wind_speed', 'pop', 'icon', 'weather')
+
+    def __init__(self, dt, temp, humidity, wind_speed, pop, icon, weather, icons, conditions, timezone=0):
+        self.dt = dt                    # int64 unix seconds
+        self.temp = temp                # float32
+        self.humidity = humidity        # uint8 percent
+        self.wind_speed = wind_speed    # float32
+        self.pop = pop                  # float32, 0-1
+        self.icon = icon                # uint8 index into icons
+        self.weather = weather          # uint8 index into conditions
+        self.icons = icons
+        self.conditions = conditions
+        self.timezone = timezone        # city UTC offset in seconds
+
+    @classmethod
+    def from_response(cls, forecast_data):
+        """Build a frame from a /forecast JSON response"""
+        if forecast_data is None or isinstance(forecast_data, cls):
+            return forecast_data
+
+        items = forecast_data['list']
+        count = len(items)
+        icons, icon_codes = np.unique([item['weather'][0]['icon'] for item in items], return_inverse=True)
+        conditions, weather_codes = np.unique([item['weather'][0]['main'] for item in items], return_inverse=True)
+
+        return cls(
+            dt=np.fromiter((item['dt'] for item in items), dtype=np.int64, count=count),
+            temp=np.fromiter((item['main']['temp'] for item in items), dtype=np.float32, count=count),
+            humidity=np.fromiter((item['main']['humidity'] for item in items), dtype=np.uint8, count=count),
+            wind_speed=np.fromiter((item['wind']['speed'] for item in items), dtype=np.float32, count=count),
+            pop=np.fromiter((item.get('pop', 0) for item in items), dtype=np.float32, count=count),
+            icon=icon_codes.astype(np.uint8),
+            weather=weather_codes.astype(np.uint8),
+            icons=tuple(icons.tolist()),
+            conditions=tuple(conditions.tolist()),
+            timezone=forecast_data.get('city', {}).get('timezone', 0),
+        )
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.COLUMNS)
+
+    def __len__(self):
+        return len(self.dt)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # Basic slicing returns views, so no column is copied
+            return ForecastFrame(
+                *(getattr(self, name)[index] for name in self.COLUMNS),
+                icons=self.icons,
+                conditions=self.conditions,
+                timezone=self.timezone,
+            )
+        return self.row(index)
+
+    def __iter__(self):
+        labels = self.time_labels()
+        for idx in range(len(self)):
+            yield self.row(idx, labels[idx])
+
+    def hourly(self, count=7):
+        """The first count forecast steps"""
+        return self[:count]
+
+    def local_datetimes(self):
+        """Timestamps as datetime64 in the city's local time"""
+        return (self.dt + self.timezone).astype('datetime64[s]')
+
+    def time_labels(self):
+        """'3 PM' style labels in the city's local time"""
+        hours = (self.dt + self.timezone) // 3600 % 24
+        return [f"{(hour % 12) or 12} {'AM' if hour < 12 else 'PM'}" for hour in hours.tolist()]
+
+    def icon_codes(self):
+        return [self.icons[code] for code in self.icon.tolist()]
+
+    def condition_names(self):
+        return [self.conditions[code] for code in self.weather.tolist()]
+
+    def row(self, idx, label=None):
+        """One forecast step in the dict shape the UI renders"""
+        if label is None:
+            label = self[idx:idx + 1 or None].time_labels()[0]
+        return {
+            'time': label,
+            'temp': round(float(self.temp[idx])),
+            'icon': self.icons[self.icon[idx]],
+            'weather': self.conditions[self.weather[idx]],
+            'humidity': int(self.humidity[idx]),
+            'wind_speed': round(float(self.wind_speed[idx]), 1),
+            'pop': round(float(self.pop[idx]) * 100),
+        }
+
+    def columns(self):
+        """Columns in the layout forecast_engine aggregates"""
+        return {
+            'dt': self.dt,
+            'temp': self.temp.astype(np.float64),
+            'pop': self.pop.astype(np.float64),
+            'weather': np.array(self.conditions, dtype=object)[self.weather],
+            'icon': np.array(self.icons, dtype=object)[self.icon],
+            'timezone': self.timezone,
+        }
@@ -0,0 +1,213 @@
+import bisect
+import heapq
+import os
+import threading
+import unicodedata
+from array import array
+from config import Config
+
+
+def normalize_name(text):
+    """Casefold and strip accents so 'São Paulo' matches 'sao paulo'"""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.replace('-', ' ').replace('.', '').split())
+
+
+def _deletes(key):
+    """All strings one deletion away from key"""
+    return {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+def _within_one_edit(a, b):
+    """True when a and b differ by at most one insert, delete, substitution or transposition"""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+
+    i = 0
+    while i < min(la, lb) and a[i] == b[i]:
+        i += 1
+
+    if la == lb:
+        if a[i + 1:] == b[i + 1:]:
+            return True
+        return (
+            i + 1 < la and a[i] == b[i + 1] and a[i + 1] == b[i]
+            and a[i + 2:] == b[i + 2:]
+        )
+    if la > lb:
+        return a[i + 1:] == b[i:]
+    return a[i:] == b[i + 1:]
+
+
+class Gazetteer:
+    """Offline city index with prefix and typo-tolerant lookup"""
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    # Short prefixes match too many names to rank on the fly, so their
+    # top results are precomputed when the index is built
+    PRECOMPUTED_PREFIX_LENGTH = 2
+    MAX_PREFIX_SCAN = 2000
+
+    def __init__(self, cities_path, countries_path=None):
+        self.names = []
+        self.countries = []
+        self.lat = array('d')
+        self.lon = array('d')
+        self.population = array('q')
+        self.country_names = {}
+
+        if countries_path and os.path.exists(countries_path):
+            for code, name in self._read_rows(countries_path):
+                self.country_names[code] = name
+
+        for name, country, lat, lon, population in self._read_rows(cities_path):
+            self.names.append(name)
+            self.countries.append(country)
+            self.lat.append(float(lat))
+            self.lon.append(float(lon))
+            self.population.append(int(population))
+
+        self._build_index()
+
+    @classmethod
+    def default(cls):
+        """Get the bundled gazetteer, loaded once per process"""
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls(Config.GAZETTEER_PATH, Config.GAZETTEER_COUNTRIES_PATH)
+        return cls._default
+
+    @staticmethod
+    def _read_rows(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('#') or not line.strip():
+                    continue
+                yield line.rstrip('\n').split('\t')
+
+    def _build_index(self):
+        by_key = {}
+        for idx, name in enumerate(self.names):
+            by_key.setdefault(normalize_name(name), []).append(idx)
+
+        rank = lambda idx: -self.population[idx]
+        self._exact = {key: sorted(ids, key=rank) for key, ids in by_key.items()}
+
+        # Sorted keys for bisect-based prefix ranges
+        self._keys = sorted(self._exact)
+
+        # Deletion neighbourhood for distance-1 typo tolerance
+        self._deletion_index = {}
+        for key in self._keys:
+            for variant in _deletes(key):
+                self._deletion_index.setdefault(variant, []).append(key)
+
+        # Top cities for every short prefix
+        self._short_prefixes = {}
+        for key, ids in self._exact.items():
+            for length in range(1, self.PRECOMPUTED_PREFIX_LENGTH + 1):
+                if len(key) >= length:
+                    self._short_prefixes.setdefault(key[:length], []).extend(ids)
+        for prefix, ids in self._short_prefixes.items():
+            self._short_prefixes[prefix] = heapq.nsmallest(Config.GAZETTEER_MAX_SUGGESTIONS, ids, key=rank)
+
+        self._country_codes = {normalize_name(name): code for code, name in self.country_names.items()}
+        self._country_codes.update({code.casefold(): code for code in set(self.countries)})
+
+    def __len__(self):
+        return len(self.names)
+
+    def address(self, idx):
+        """Display address in the same 'Name, CC' form as OpenWeather geocoding"""
+        return f"{self.names[idx]}, {self.countries[idx]}"
+
+    def record(self, idx):
+        return {
+            'id': idx,
+            'name': self.names[idx],
+            'country': self.countries[idx],
+            'lat': self.lat[idx],
+            'lon': self.lon[idx],
+            'address': self.address(idx),
+        }
+
+    def resolve(self, query):
+        """Resolve 'City' or 'City, Country' to (lat, lon, address) without a network call"""
+        parts = [normalize_name(part) for part in query.split(',')]
+        if not parts or not parts[0] or len(parts) > 2:
+            return None
+
+        ids = self._exact.get(parts[0])
+        if not ids:
+            return None
+
+        if len(parts) == 2:
+            code = self._country_codes.get(parts[1])
+            if code is None:
+                return None
+            ids = [idx for idx in ids if self.countries[idx] == code]
+            if not ids:
+                return None
+
+        idx = ids[0]
+        return self.lat[idx], self.lon[idx], self.address(idx)
+
+    def suggest(self, text, limit=None):
+        """Cities whose name starts with text, falling back to one-typo matches; one per address"""
+        limit = limit or Config.GAZETTEER_MAX_SUGGESTIONS
+        prefix = normalize_name(text.split(',')[0])
+        if not prefix:
+            return []
+
+        # Over-fetch so dropping duplicate addresses below still fills the list
+        pool = limit * 2
+        ids = self._prefix_matches(prefix, pool)
+        if len(ids) < pool:
+            seen = set(ids)
+            ids.extend(idx for idx in self._fuzzy_matches(prefix, pool) if idx not in seen)
+
+        # Same-named towns in one country share an address; keep the largest,
+        # which is also the one resolve() picks for that address
+        records = []
+        addresses = set()
+        for idx in ids:
+            address = self.address(idx)
+            if address not in addresses:
+                addresses.add(address)
+                records.append(self.record(idx))
+        return records[:limit]
+
+    def _prefix_matches(self, prefix, limit):
+        if prefix in self._short_prefixes:
+            return list(self._short_prefixes[prefix][:limit])
+
+        start = bisect.bisect_left(self._keys, prefix)
+        candidates = []
+        for key in self._keys[start:start + self.MAX_PREFIX_SCAN]:
+            if not key.startswith(prefix):
+                break
+            candidates.extend(self._exact[key])
+        return heapq.nsmallest(limit, candidates, key=lambda idx: -self.population[idx])
+
+    def _fuzzy_matches(self, query, limit):
+        keys = set(self._deletion_index.get(query, ()))
+        if query in self._exact:
+            keys.add(query)
+        for variant in _deletes(query):
+            if variant in self._exact:
+                keys.add(variant)
+            keys.update(self._deletion_index.get(variant, ()))
+
+        candidates = [
+            idx
+            for key in keys if _within_one_edit(query, key)
+            for idx in self._exact[key]
+        ]
+        return heapq.nsmallest(limit, candidates, key=lambda idx: -self.population[idx])
@@ -0,0 +1,73 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+def normalize_query(query):
+    """Normalize a location query so spelling variants share a cache entry"""
+    return ' '.join(query.casefold().replace(',', ', ').split())
+
+
+class GeocodeCache:
+    """SQLite-backed geocoding cache that survives restarts"""
+
+    # Returned for queries that are cached as "not found"
+    NOT_FOUND = object()
+
+    def __init__(self, path, ttl, negative_ttl):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocode (
+                query TEXT PRIMARY KEY,
+                lat REAL,
+                lon REAL,
+                address TEXT,
+                expires_at REAL NOT NULL
+            )
+        """)
+
+    def get(self, query):
+        """Return (lat, lon, address), NOT_FOUND, or None on a miss"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT lat, lon, address, expires_at FROM geocode WHERE query = ?",
+                (normalize_query(query),)
+            ).fetchone()
+
+        if row is None or row[3] <= time.time():
+            return None
+        if row[0] is None:
+            return self.NOT_FOUND
+        return row[0], row[1], row[2]
+
+    def set(self, query, lat, lon, address):
+        """Cache a successful lookup"""
+        self._store(query, lat, lon, address, self.ttl)
+
+    def set_not_found(self, query):
+        """Cache a lookup that no provider could resolve, for a shorter time"""
+        self._store(query, None, None, None, self.negative_ttl)
+
+    def purge_expired(self):
+        """Delete expired rows"""
+        with self._lock:
+            self._conn.execute("DELETE FROM geocode WHERE expires_at <= ?", (time.time(),))
+
+    def _store(self, query, lat, lon, address, ttl):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode (query, lat, lon, address, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (normalize_query(query), lat, lon, address, time.time() + ttl)
+            )
@@ -0,0 +1,97 @@
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from config import Config
+from modules.cache_manager import snap_coordinates
+
+
+class HistoryStore:
+    """SQLite log of observed conditions per location, for trend charts"""
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    COLUMNS = ('dt', 'temp', 'humidity', 'wind_speed')
+
+    def __init__(self, path, retention):
+        self.path = path
+        self.retention = retention
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS observations (
+                lat REAL NOT NULL,
+                lon REAL NOT NULL,
+                dt INTEGER NOT NULL,
+                temp REAL,
+                humidity REAL,
+                wind_speed REAL,
+                PRIMARY KEY (lat, lon, dt)
+            ) WITHOUT ROWID
+        """)
+
+    @classmethod
+    def default(cls):
+        """Get the process-wide store, dropping observations past the retention window"""
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    store = cls(Config.HISTORY_PATH, Config.HISTORY_RETENTION)
+                    store.purge_expired()
+                    cls._default = store
+        return cls._default
+
+    def record(self, lat, lon, weather_data):
+        """Store one /weather observation; repeats of the same reading are ignored"""
+        if not weather_data or 'dt' not in weather_data:
+            return False
+        lat, lon = snap_coordinates(lat, lon, Config.CACHE_GRID_DEGREES)
+        main = weather_data.get('main', {})
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO observations (lat, lon, dt, temp, humidity, wind_speed) VALUES (?, ?, ?, ?, ?, ?)",
+                (lat, lon, int(weather_data['dt']), main.get('temp'), main.get('humidity'),
+                 weather_data.get('wind', {}).get('speed'))
+            )
+        return cursor.rowcount > 0
+
+    def revision(self, lat, lon):
+        """(oldest dt, latest dt) for a location; changes whenever its series does"""
+        lat, lon = snap_coordinates(lat, lon, Config.CACHE_GRID_DEGREES)
+        # Separate subqueries so each end is a single index lookup, however long the series is
+        with self._lock:
+            return self._conn.execute(
+                "SELECT (SELECT MIN(dt) FROM observations WHERE lat = ? AND lon = ?), "
+                "(SELECT MAX(dt) FROM observations WHERE lat = ? AND lon = ?)",
+                (lat, lon, lat, lon)
+            ).fetchone()
+
+    def series(self, lat, lon, since=None):
+        """Columns as NumPy arrays, oldest first; missing readings are NaN"""
+        lat, lon = snap_coordinates(lat, lon, Config.CACHE_GRID_DEGREES)
+        since = time.time() - self.retention if since is None else since
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT dt, temp, humidity, wind_speed FROM observations "
+                "WHERE lat = ? AND lon = ? AND dt >= ? ORDER BY dt",
+                (lat, lon, int(since))
+            ).fetchall()
+
+        table = np.array(rows, dtype=np.float64).reshape(len(rows), len(self.COLUMNS))
+        series = {name: table[:, idx] for idx, name in enumerate(self.COLUMNS)}
+        series['dt'] = series['dt'].astype(np.int64)
+        return series
+
+    def purge_expired(self):
+        """Delete observations older than the retention window"""
+        with self._lock:
+            self._conn.execute("DELETE FROM observations WHERE dt < ?", (int(time.time() - self.retention),))
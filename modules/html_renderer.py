@@ -0,0 +1,43 @@
+import hashlib
+import html
+from string import Template
+from config import Config
+from modules.cache_manager import TTLCache
+
+
+def compile_template(text):
+    """Compile an HTML template once, dropping indentation and blank lines.
+
+    Streamlit's markdown treats a blank line as the end of an HTML block and
+    indented lines after it as code, so templates are flattened up front.
+    """
+    return Template('\n'.join(line.strip() for line in text.splitlines() if line.strip()))
+
+
+def escape(value):
+    """HTML-escape a value for interpolation into a template"""
+    return html.escape(str(value), quote=True)
+
+
+class HtmlRenderer:
+    """Renders UI sections from compiled templates, memoized by content hash across sessions"""
+
+    def __init__(self, max_bytes=None, ttl=None):
+        self.ttl = ttl or Config.HTML_CACHE_TTL
+        self._cache = TTLCache(max_bytes=max_bytes or Config.HTML_CACHE_MAX_BYTES)
+
+    @staticmethod
+    def content_hash(section, content):
+        return hashlib.blake2b(f"{section}:{content!r}".encode(), digest_size=16).hexdigest()
+
+    def render(self, section, content, build):
+        """Return build()'s HTML for this content, reusing it for identical content"""
+        key = self.content_hash(section, content)
+        rendered = self._cache.get(key)
+        if rendered is None:
+            rendered = build()
+            self._cache.set(key, rendered, self.ttl)
+        return rendered
+
+    def stats(self):
+        return self._cache.stats()
@@ -0,0 +1,130 @@
+import base64
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+
+# Every condition icon OpenWeather serves
+KNOWN_ICONS = tuple(
+    f"{code}{period}"
+    for code in ('01', '02', '03', '04', '09', '10', '11', '13', '50')
+    for period in ('d', 'n')
+)
+
+ICON_PATTERN = re.compile(r'^\d{2}[dn]$')
+
+
+def normalize_icon(code):
+    """Icon code safe to use in a class name; unknown codes map to clear sky"""
+    code = str(code or '')
+    return code if ICON_PATTERN.match(code) else '01d'
+
+
+class IconCache:
+    """Downloads each weather icon once and serves them to the page as one CSS sprite"""
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, base_url=None, scale=None, max_entries=None, retry_after=None):
+        self.base_url = (base_url or Config.ICON_BASE_URL).rstrip('/')
+        self.scale = scale or Config.ICON_SCALE
+        self.max_entries = max_entries or Config.ICON_CACHE_MAX_ENTRIES
+        self.retry_after = Config.ICON_RETRY_AFTER if retry_after is None else retry_after
+
+        self._lock = threading.Lock()
+        self._icons = OrderedDict()   # code -> data URI, least recently used first
+        self._failed = {}             # code -> monotonic time of the last failed download
+        self._sprite = None
+        self._warmed = threading.Event()
+        self.downloads = 0
+
+    @classmethod
+    def default(cls):
+        """Get the process-wide cache, warming every known icon in the background"""
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cache = cls()
+                    threading.Thread(target=cache.warm, name="icon-cache", daemon=True).start()
+                    cls._default = cache
+        return cls._default
+
+    def remote_url(self, code):
+        return f"{self.base_url}/{normalize_icon(code)}@{self.scale}.png"
+
+    def _download(self, code):
+        # Imported here so the icon cache doesn't pull in the API module at import time
+        from modules.weather_api import WeatherAPI
+
+        response = WeatherAPI.get_session().get(self.remote_url(code), timeout=Config.HTTP_TIMEOUT)
+        response.raise_for_status()
+        content_type = response.headers.get('Content-Type', 'image/png').split(';')[0]
+        return f"data:{content_type};base64,{base64.b64encode(response.content).decode('ascii')}"
+
+    def get(self, code):
+        """Data URI for an icon, downloading it on first use; None while unavailable"""
+        code = normalize_icon(code)
+        with self._lock:
+            if code in self._icons:
+                self._icons.move_to_end(code)
+                return self._icons[code]
+            failed_at = self._failed.get(code)
+            if failed_at is not None and time.monotonic() - failed_at < self.retry_after:
+                return None
+
+        try:
+            data_uri = self._download(code)
+        except Exception as e:
+            print(f"Icon download error for {code}: {str(e)}")
+            with self._lock:
+                self._failed[code] = time.monotonic()
+            return None
+
+        with self._lock:
+            self._failed.pop(code, None)
+            self._icons[code] = data_uri
+            self._icons.move_to_end(code)
+            while len(self._icons) > self.max_entries:
+                self._icons.popitem(last=False)
+            self._sprite = None
+            self.downloads += 1
+        return data_uri
+
+    def warm(self, codes=KNOWN_ICONS):
+        try:
+            for code in codes:
+                self.get(code)
+        finally:
+            with self._lock:
+                self._sprite = None
+                self._warmed.set()
+
+    def sprite_css(self):
+        """One rule per icon: inline data URIs once warm-up is done, the remote image otherwise"""
+        # Inlining icons one by one as they arrive would change the sprite, and
+        # re-send all of it to every session, after each download
+        with self._lock:
+            if self._sprite is None:
+                warmed = self._warmed.is_set()
+                rules = []
+                for code in KNOWN_ICONS:
+                    source = (self._icons.get(code) if warmed else None) or self.remote_url(code)
+                    rules.append(f'.icon-{code} {{ background-image: url("{source}"); }}')
+                self._sprite = '\n'.join(rules)
+            return self._sprite
+
+    def sprite_hash(self):
+        return hashlib.blake2b(self.sprite_css().encode(), digest_size=8).hexdigest()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'icons': len(self._icons),
+                'failed': len(self._failed),
+                'downloads': self.downloads,
+                'warmed': self._warmed.is_set(),
+                'bytes': sum(len(uri) for uri in self._icons.values()),
+            }
@@ -0,0 +1,147 @@
+import numpy as np
+from modules.forecast_frame import ForecastFrame
+
+SECONDS_PER_HOUR = 3600
+STEP = 3 * SECONDS_PER_HOUR
+
+
+def _pchip_slopes(x, y):
+    """Fritsch-Carlson slopes for monotone cubic interpolation, one row per series"""
+    h = np.diff(x, axis=1)
+    delta = np.diff(y, axis=1) / h
+
+    slopes = np.empty_like(y)
+    slopes[:, 0] = delta[:, 0]
+    slopes[:, -1] = delta[:, -1]
+
+    if y.shape[1] > 2:
+        h0, h1 = h[:, :-1], h[:, 1:]
+        d0, d1 = delta[:, :-1], delta[:, 1:]
+        w1 = 2 * h1 + h0
+        w2 = h1 + 2 * h0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            harmonic = (w1 + w2) / (w1 / d0 + w2 / d1)
+        # Flat where the data changes direction, so no overshoot
+        slopes[:, 1:-1] = np.where(d0 * d1 > 0, harmonic, 0.0)
+
+    return slopes
+
+
+def pchip(x, y, xq):
+    """Evaluate monotone cubic interpolants row-wise: x, y are (n, m), xq is (n, k)"""
+    slopes = _pchip_slopes(x, y)
+    idx = np.clip((xq[:, :, None] >= x[:, None, :]).sum(axis=2) - 1, 0, x.shape[1] - 2)
+
+    x0 = np.take_along_axis(x, idx, axis=1)
+    x1 = np.take_along_axis(x, idx + 1, axis=1)
+    y0 = np.take_along_axis(y, idx, axis=1)
+    y1 = np.take_along_axis(y, idx + 1, axis=1)
+    m0 = np.take_along_axis(slopes, idx, axis=1)
+    m1 = np.take_along_axis(slopes, idx + 1, axis=1)
+
+    h = x1 - x0
+    t = np.clip((xq - x0) / h, 0.0, 1.0)
+    t2, t3 = t * t, t * t * t
+    return (
+        (2 * t3 - 3 * t2 + 1) * y0
+        + (t3 - 2 * t2 + t) * h * m0
+        + (-2 * t3 + 3 * t2) * y1
+        + (t3 - t2) * h * m1
+    )
+
+
+def nearest(x, xq):
+    """Index of the nearest knot for every query point, row-wise"""
+    idx = np.clip((xq[:, :, None] >= x[:, None, :]).sum(axis=2) - 1, 0, x.shape[1] - 2)
+    x0 = np.take_along_axis(x, idx, axis=1)
+    x1 = np.take_along_axis(x, idx + 1, axis=1)
+    return np.where(xq - x0 <= x1 - xq, idx, idx + 1)
+
+
+def _knots(frame, current):
+    """Knot table for one location: the current observation followed by later forecast steps"""
+    if current and 'dt' in current:
+        anchor_dt = current['dt']
+        keep = frame.dt > anchor_dt
+        dt = np.concatenate(([anchor_dt], frame.dt[keep]))
+        temp = np.concatenate(([current['main']['temp']], frame.temp[keep]))
+        humidity = np.concatenate(([current['main']['humidity']], frame.humidity[keep]))
+        wind = np.concatenate(([current.get('wind', {}).get('speed', frame.wind_speed[0])], frame.wind_speed[keep]))
+        pop = np.concatenate(([frame.pop[keep][0] if keep.any() else 0.0], frame.pop[keep]))
+        icons = [current['weather'][0]['icon']] + [frame.icons[code] for code in frame.icon[keep]]
+        conditions = [current['weather'][0]['main']] + [frame.conditions[code] for code in frame.weather[keep]]
+    else:
+        dt, temp, humidity, wind, pop = frame.dt, frame.temp, frame.humidity, frame.wind_speed, frame.pop
+        icons, conditions = frame.icon_codes(), frame.condition_names()
+
+    return {
+        'dt': dt.astype(np.float64),
+        'temp': np.asarray(temp, dtype=np.float64),
+        'humidity': np.asarray(humidity, dtype=np.float64),
+        'wind': np.asarray(wind, dtype=np.float64),
+        'pop': np.asarray(pop, dtype=np.float64),
+        'icons': icons,
+        'conditions': conditions,
+    }
+
+
+def _pad(values, length, step=0.0):
+    """Extend a row to length by repeating its last value, advancing by step"""
+    missing = length - len(values)
+    if missing <= 0:
+        return values
+    tail = values[-1] + step * np.arange(1, missing + 1)
+    return np.concatenate((values, tail))
+
+
+def interpolate_hourly_many(frames, currents=None, hours=7):
+    """Hourly series for many locations from their 3-hourly forecasts, in one vectorized pass"""
+    currents = currents or [None] * len(frames)
+    tables = [_knots(frame, current) for frame, current in zip(frames, currents)]
+    if not tables:
+        return []
+
+    width = max(2, max(len(table['dt']) for table in tables))
+    x = np.stack([_pad(table['dt'], width, STEP) for table in tables])
+    fields = {
+        name: np.stack([_pad(table[name], width) for table in tables])
+        for name in ('temp', 'humidity', 'wind', 'pop')
+    }
+
+    # Hourly targets starting at the first full local hour after each anchor;
+    # aligning in UTC would put +5:30 or +9:45 cities at HH:30 / HH:15
+    tz = np.array([[frame.timezone] for frame in frames], dtype=np.float64)
+    start = np.ceil((x[:, :1] + tz) / SECONDS_PER_HOUR) * SECONDS_PER_HOUR - tz
+    xq = start + SECONDS_PER_HOUR * np.arange(hours)
+
+    temp = pchip(x, fields['temp'], xq)
+    humidity = np.clip(pchip(x, fields['humidity'], xq), 0, 100)
+    wind = np.clip(pchip(x, fields['wind'], xq), 0, None)
+    pop = np.clip(pchip(x, fields['pop'], xq), 0, 1)
+    steps = nearest(x, xq)
+
+    results = []
+    for row, (frame, table) in enumerate(zip(frames, tables)):
+        picks = np.minimum(steps[row], len(table['icons']) - 1)
+        icons, icon_codes = np.unique(np.array(table['icons'], dtype=object)[picks].astype(str), return_inverse=True)
+        conditions, weather_codes = np.unique(
+            np.array(table['conditions'], dtype=object)[picks].astype(str), return_inverse=True
+        )
+        results.append(ForecastFrame(
+            dt=xq[row].astype(np.int64),
+            temp=temp[row].astype(np.float32),
+            humidity=np.round(humidity[row]).astype(np.uint8),
+            wind_speed=wind[row].astype(np.float32),
+            pop=pop[row].astype(np.float32),
+            icon=icon_codes.astype(np.uint8),
+            weather=weather_codes.astype(np.uint8),
+            icons=tuple(icons.tolist()),
+            conditions=tuple(conditions.tolist()),
+            timezone=frame.timezone,
+        ))
+    return results
+
+
+def interpolate_hourly(frame, current=None, hours=7):
+    """Hourly series for one location, anchored to its current observation"""
+    return interpolate_hourly_many([frame], [current], hours)[0]
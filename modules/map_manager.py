@@ -1,20 +1,87 @@
+import hashlib
+import json
+import os
+import threading
 import folium
-from streamlit_folium import folium_static
+from folium.plugins import FastMarkerCluster
 import streamlit as st
+import streamlit.components.v1 as components
 from config import Config
+from modules import ui_templates as templates
+from modules.cache_manager import TTLCache
+from modules.html_renderer import escape
+from modules.rate_limiter import INTERACTIVE
+from modules.tile_proxy import TileProxy
+from modules.weather_field import FIELD_NAMES, WeatherField
+
+# Builds one marker per [lat, lon, name, temp, condition] row in the browser
+PLACE_MARKER_CALLBACK = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    var label = row[3] === null ? row[2] : row[2] + ': ' + row[3] + '°C, ' + row[4];
+    marker.bindTooltip(label);
+    return marker;
+}
+"""
 
 class MapManager:
+    # Rendered map documents keyed by (lat, lon, name, zoom, overlay), shared by every session
+    _html_cache = TTLCache(max_bytes=Config.MAP_CACHE_MAX_BYTES)
+    
+    # CDN URL -> locally served copy, from scripts/fetch_vendor.py
+    _vendor_urls = None
+    _vendor_lock = threading.Lock()
+    
+    @classmethod
+    def vendor_urls(cls):
+        """Local replacements for folium's CDN assets; empty when they haven't been fetched"""
+        if cls._vendor_urls is None:
+            with cls._vendor_lock:
+                if cls._vendor_urls is None:
+                    prefix = f"{Config.STATIC_URL}/{os.path.relpath(Config.VENDOR_DIR, Config.STATIC_DIR)}"
+                    try:
+                        with open(os.path.join(Config.VENDOR_DIR, 'manifest.json'), encoding='utf-8') as f:
+                            manifest = json.load(f)
+                    except (OSError, ValueError):
+                        manifest = {}
+                    cls._vendor_urls = {url: f"{prefix}/{path}" for url, path in manifest.items()}
+        return cls._vendor_urls
+    
+    @staticmethod
+    def _use_local_assets(element):
+        """Point an element tree's scripts and stylesheets at local copies where available"""
+        vendor = MapManager.vendor_urls()
+        if not vendor:
+            return
+        
+        stack = [element]
+        while stack:
+            node = stack.pop()
+            for attr in ('default_js', 'default_css'):
+                assets = getattr(node, attr, None)
+                if assets:
+                    setattr(node, attr, [(name, vendor.get(url, url)) for name, url in assets])
+            stack.extend(getattr(node, '_children', {}).values())
+    
+    @staticmethod
+    def _tile_layer():
+        """Tiles come from the local proxy when it's enabled, else straight from CartoDB"""
+        if Config.TILE_PROXY_ENABLED:
+            return TileProxy.start_default().tile_url, Config.TILE_ATTRIBUTION
+        return "CartoDB positron", 'CartoDB'
+    
     @staticmethod
-    def create_map(lat, lon, location_name):
-        """Create interactive map - FIXED attribution"""
+    def create_map(lat, lon, location_name, overlay=None, zoom=None):
+        """Create interactive map - FIXED attribution; overlay is (field, image, bounds)"""
         try:
-            # Create map with CartoDB tiles (no attribution issues)
+            tiles, attr = MapManager._tile_layer()
+            
             m = folium.Map(
                 location=[lat, lon],
-                zoom_start=Config.MAP_ZOOM,
-                tiles="CartoDB positron",
+                zoom_start=zoom or Config.MAP_ZOOM,
+                tiles=tiles,
                 control_scale=True,
-                attr='CartoDB'
+                attr=attr
             )
             
             # Add marker
@@ -36,6 +103,19 @@ class MapManager:
                 weight=2
             ).add_to(m)
             
+            if overlay:
+                field, image, bounds = overlay
+                folium.raster_layers.ImageOverlay(
+                    image=image,
+                    bounds=bounds,
+                    opacity=Config.FIELD_OPACITY,
+                    name=FIELD_NAMES[field],
+                    pixelated=False,
+                    interactive=False,
+                    zindex=1
+                ).add_to(m)
+                folium.LayerControl(collapsed=True).add_to(m)
+            
             return m
             
         except Exception as e:
@@ -43,20 +123,125 @@ class MapManager:
             return None
     
     @staticmethod
-    def display_map(lat, lon, location_name):
-        """Display interactive map in Streamlit"""
+    def render_map_html(lat, lon, location_name, zoom=None, weather_api=None, field=None):
+        """Full HTML document for a location map, rendered once per location and overlay image"""
+        zoom = zoom or Config.MAP_ZOOM
+        
+        overlay = None
+        if field and weather_api is not None:
+            image = WeatherField(weather_api).overlay(field, lat, lon, zoom)
+            if image is not None:
+                overlay = (field, *image)
+        
+        overlay_key = None
+        if overlay:
+            overlay_key = (field, hashlib.blake2b(overlay[1].encode(), digest_size=16).hexdigest())
+        key = (round(lat, 4), round(lon, 4), location_name, zoom, overlay_key)
+        
+        html = MapManager._html_cache.get(key)
+        if html is None:
+            map_obj = MapManager.create_map(lat, lon, location_name, overlay, zoom)
+            if map_obj is None:
+                return None
+            
+            MapManager._use_local_assets(map_obj.get_root())
+            html = map_obj.get_root().render()
+            # Overlays go stale with the readings they were drawn from
+            ttl = Config.CACHE_TTL['weather'] if overlay else Config.MAP_CACHE_TTL
+            MapManager._html_cache.set(key, html, ttl)
+        return html
+    
+    @staticmethod
+    def _show_html(html, height=None):
+        height = height or Config.MAP_HEIGHT
+        if hasattr(st, 'iframe'):
+            st.iframe(html, height=height)
+        else:
+            components.html(html, height=height)
+    
+    @staticmethod
+    def collect_places(weather_api, places, fetch_limit=None):
+        """[lat, lon, name, temp, condition] per place, from the shared cache plus a bounded batch fetch"""
+        fetch_limit = Config.PLACES_MAP_FETCH_LIMIT if fetch_limit is None else fetch_limit
+        
+        weather = {}
+        missing = []
+        for name, lat, lon in places:
+            data = weather_api.cached('weather', lat, lon)
+            if data is not None:
+                weather[(lat, lon)] = data
+            elif len(missing) < fetch_limit:
+                missing.append((lat, lon))
+        
+        # The page is waiting on these, so they queue ahead of prefetching
+        for result in weather_api.get_current_weather_many(missing, priority=INTERACTIVE):
+            if result.data is not None:
+                weather[(result.lat, result.lon)] = result.data
+        
+        rows = []
+        for name, lat, lon in places:
+            data = weather.get((lat, lon))
+            temp = round(data['main']['temp']) if data else None
+            condition = escape(data['weather'][0]['main']) if data else None
+            rows.append([round(lat, 4), round(lon, 4), escape(name), temp, condition])
+        return rows
+    
+    @staticmethod
+    def create_places_map(rows):
+        """One map for many places, clustered in the browser from a single data array"""
+        lats = [row[0] for row in rows]
+        lons = [row[1] for row in rows]
+        tiles, attr = MapManager._tile_layer()
+        
+        m = folium.Map(tiles=tiles, attr=attr, control_scale=True)
+        m.fit_bounds([[min(lats), min(lons)], [max(lats), max(lons)]], max_zoom=Config.MAP_ZOOM)
+        
+        # Markers are built client-side, so the page carries one array rather
+        # than a folium object per place
+        FastMarkerCluster(data=rows, callback=PLACE_MARKER_CALLBACK).add_to(m)
+        return m
+    
+    @staticmethod
+    def render_places_html(rows):
+        """Full HTML document for the places map, rendered once per set of places and readings"""
+        key = ('places', hashlib.blake2b(repr(rows).encode(), digest_size=16).hexdigest())
+        
+        html = MapManager._html_cache.get(key)
+        if html is None:
+            map_obj = MapManager.create_places_map(rows)
+            MapManager._use_local_assets(map_obj.get_root())
+            html = map_obj.get_root().render()
+            MapManager._html_cache.set(key, html, Config.CACHE_TTL['weather'])
+        return html
+    
+    @staticmethod
+    def display_places_map(weather_api, places):
+        """Display every given (name, lat, lon) place with its current conditions"""
+        if not places:
+            st.info("No places to show yet. Add favorites or search for a few cities.")
+            return
+        
+        st.markdown(templates.SECTION_HEADER.substitute(title='🗺️ My Places'), unsafe_allow_html=True)
+        
         try:
-            st.markdown("""
-            <div style="margin: 30px 0 20px 0;">
-                <h3 style="color: #202124; font-size: 28px; font-weight: 700;">🗺️ Location Map</h3>
-            </div>
-            """, unsafe_allow_html=True)
+            rows = MapManager.collect_places(weather_api, places)
+            MapManager._show_html(MapManager.render_places_html(rows))
+        except Exception as e:
+            st.error(f"Map display error: {str(e)}")
+    
+    @staticmethod
+    def display_map(lat, lon, location_name, weather_api=None, field=None, zoom=None):
+        """Display interactive map in Streamlit, optionally under a 'temp' or 'precip' field overlay"""
+        try:
+            st.markdown(templates.SECTION_HEADER.substitute(title='🗺️ Location Map'), unsafe_allow_html=True)
             
-            map_obj = MapManager.create_map(lat, lon, location_name)
+            map_html = MapManager.render_map_html(
+                lat, lon, location_name, zoom=zoom, weather_api=weather_api, field=field
+            )
             
-            if map_obj:
+            if map_html:
                 # Display map
-                folium_static(map_obj, width=700, height=500)
+                MapManager._show_html(map_html)
                 
                 # Map controls and info
                 st.markdown('<div class="weather-card">', unsafe_allow_html=True)
@@ -0,0 +1,127 @@
+import random
+import threading
+import time
+from config import Config
+from modules.gazetteer import Gazetteer
+from modules.rate_limiter import BACKGROUND
+
+
+class PrefetchScheduler:
+    """Background thread that refreshes hot locations before their cache entries expire"""
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    ENDPOINTS = ('weather', 'forecast', 'air_pollution')
+
+    def __init__(self, weather_api, interval=None, lead_time=None, budget_per_minute=None, jitter=None):
+        self.weather_api = weather_api
+        self.interval = interval or Config.PREFETCH_INTERVAL
+        self.lead_time = lead_time or Config.PREFETCH_LEAD_TIME
+        self.budget_per_minute = budget_per_minute or Config.PREFETCH_BUDGET_PER_MINUTE
+        self.jitter = Config.PREFETCH_JITTER if jitter is None else jitter
+
+        self._lock = threading.Lock()
+        self._pinned = set()     # location names that are always kept warm
+        self._seen = {}          # location name -> last time a session asked for it
+        self._coordinates = {}   # location name -> (lat, lon)
+        self._stop = threading.Event()
+        self._thread = None
+        self.refreshed = 0
+        self.failed = 0
+
+    @classmethod
+    def start_default(cls, weather_api):
+        """Start the process-wide scheduler once, pinned to the Popular Cities"""
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    scheduler = cls(weather_api)
+                    scheduler.pin(Config.POPULAR_CITIES)
+                    scheduler.start()
+                    cls._default = scheduler
+        return cls._default
+
+    def pin(self, names):
+        """Keep these locations warm for the life of the process"""
+        with self._lock:
+            self._pinned.update(names)
+
+    def track(self, names):
+        """Keep these locations warm while sessions keep asking for them"""
+        now = time.monotonic()
+        with self._lock:
+            for name in names:
+                self._seen[name] = now
+
+    def track_location(self, name, lat, lon):
+        """Track a location whose coordinates are already known"""
+        with self._lock:
+            self._coordinates[name] = (lat, lon)
+            self._seen[name] = time.monotonic()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="weather-prefetch", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        # Warm up soon after start, then run on a jittered interval so several
+        # processes don't refresh in lockstep
+        delay = random.uniform(0, self.jitter)
+        while not self._stop.wait(delay):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Prefetch error: {str(e)}")
+            delay = self.interval + random.uniform(0, self.jitter)
+
+    def _locations(self):
+        cutoff = time.monotonic() - Config.PREFETCH_FORGET_AFTER
+        with self._lock:
+            for name in [name for name, seen in self._seen.items() if seen < cutoff]:
+                del self._seen[name]
+                if name not in self._pinned:
+                    self._coordinates.pop(name, None)
+            return self._pinned | set(self._seen)
+
+    def run_once(self):
+        """Refresh the entries closest to expiry, within this cycle's budget"""
+        budget = max(1, int(self.budget_per_minute * self.interval / 60))
+        due = []
+
+        for name in self._locations():
+            with self._lock:
+                coordinates = self._coordinates.get(name)
+            if coordinates is None:
+                # Offline lookup only: online geocoding would compete with users, and
+                # its default fallback would keep warming the wrong city
+                match = Gazetteer.default().resolve(name)
+                if match is None:
+                    continue
+                coordinates = (match[0], match[1])
+                with self._lock:
+                    self._coordinates[name] = coordinates
+            lat, lon = coordinates
+
+            for endpoint in self.ENDPOINTS:
+                remaining = self.weather_api.cache_ttl_remaining(endpoint, lat, lon)
+                # Jitter the lead time so entries cached together don't all come due together
+                if remaining is None or remaining < self.lead_time + random.uniform(0, self.jitter):
+                    due.append((remaining or 0, endpoint, lat, lon))
+
+        due.sort()
+        for _, endpoint, lat, lon in due[:budget]:
+            if self._stop.is_set():
+                break
+            try:
+                self.weather_api.refresh(endpoint, lat, lon, priority=BACKGROUND)
+                self.refreshed += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Prefetch error for {endpoint} at {lat}, {lon}: {str(e)}")
+
+        return min(len(due), budget)
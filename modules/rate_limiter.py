@@ -0,0 +1,147 @@
+import heapq
+import itertools
+import threading
+import time
+
+# Priority classes; lower values are served first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BACKGROUND: 'background'}
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a caller waits longer than allowed for an upstream token"""
+
+
+class Ticket:
+    """A caller's place in the queue; promote() can raise its priority while it waits"""
+
+    _sequence = itertools.count()
+
+    def __init__(self, priority):
+        self.priority = priority
+        self.sequence = next(self._sequence)
+        self.created = time.monotonic()
+
+    def __lt__(self, other):
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+
+class RateLimiter:
+    """Token bucket shared by every outbound call, serving waiters by priority"""
+
+    def __init__(self, rate_per_minute, burst):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters = []  # heap of Tickets
+        self._stats = {
+            priority: {'granted': 0, 'timeouts': 0, 'total_wait': 0.0, 'max_wait': 0.0}
+            for priority in PRIORITY_NAMES
+        }
+
+    def acquire(self, priority=INTERACTIVE, timeout=None, ticket=None):
+        """Block until a token is available; higher priority callers go first"""
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        ticket = ticket or Ticket(priority)
+
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            while True:
+                self._refill()
+                if self._waiters[0] == ticket and self._tokens >= 1:
+                    heapq.heappop(self._waiters)
+                    self._tokens -= 1
+                    self._record(ticket.priority, time.monotonic() - start)
+                    self._cond.notify_all()
+                    return
+
+                # Head of the queue sleeps until the next token; others until woken
+                wait = (1 - self._tokens) / self.rate if self._waiters[0] == ticket else None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._waiters.remove(ticket)
+                        heapq.heapify(self._waiters)
+                        self._stats[ticket.priority]['timeouts'] += 1
+                        self._cond.notify_all()
+                        raise RateLimitTimeout(
+                            f"Waited {timeout}s for an upstream token ({PRIORITY_NAMES[ticket.priority]})"
+                        )
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+
+    def try_acquire(self, ticket):
+        """Non-blocking acquire for event loops: 0 once granted, else seconds to wait before asking again"""
+        # The ticket queues on the first call and keeps its place among blocking
+        # callers; cancel() removes it if the caller gives up
+        with self._cond:
+            if ticket not in self._waiters:
+                heapq.heappush(self._waiters, ticket)
+            self._refill()
+            if self._waiters[0] is ticket and self._tokens >= 1:
+                heapq.heappop(self._waiters)
+                self._tokens -= 1
+                self._record(ticket.priority, time.monotonic() - ticket.created)
+                self._cond.notify_all()
+                return 0.0
+
+            # One token per caller ahead of this one, plus its own
+            ahead = sum(1 for other in self._waiters if other < ticket)
+            return max(ahead + 1 - self._tokens, 0.01) / self.rate
+
+    def cancel(self, ticket, timed_out=False):
+        """Remove a ticket queued through try_acquire"""
+        with self._cond:
+            if ticket in self._waiters:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                if timed_out:
+                    self._stats[ticket.priority]['timeouts'] += 1
+                self._cond.notify_all()
+
+    def promote(self, ticket, priority):
+        """Raise a queued ticket's priority, e.g. when an interactive caller joins its request"""
+        with self._cond:
+            if priority < ticket.priority:
+                ticket.priority = priority
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _record(self, priority, waited):
+        stats = self._stats[priority]
+        stats['granted'] += 1
+        stats['total_wait'] += waited
+        stats['max_wait'] = max(stats['max_wait'], waited)
+
+    def stats(self):
+        """Queue depth and wait times per priority class for monitoring"""
+        with self._cond:
+            self._refill()
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for ticket in self._waiters:
+                depth[PRIORITY_NAMES[ticket.priority]] += 1
+
+            return {
+                'tokens': round(self._tokens, 2),
+                'rate_per_minute': self.rate * 60,
+                'queue_depth': depth,
+                'classes': {
+                    PRIORITY_NAMES[priority]: {
+                        'granted': stats['granted'],
+                        'timeouts': stats['timeouts'],
+                        'avg_wait': stats['total_wait'] / stats['granted'] if stats['granted'] else 0.0,
+                        'max_wait': stats['max_wait'],
+                    }
+                    for priority, stats in self._stats.items()
+                },
+            }
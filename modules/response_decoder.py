@@ -0,0 +1,58 @@
+import json
+from modules.forecast_frame import ForecastFrame
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def loads(content):
+    """Parse JSON bytes with orjson when available"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _pick(source, keys):
+    return {key: source[key] for key in keys if key in source}
+
+
+def decode_current_weather(content):
+    """Keep only the /weather fields the views and map layers read"""
+    data = loads(content)
+    weather = data.get('weather') or [{}]
+
+    decoded = _pick(data, ('coord', 'visibility', 'dt', 'timezone', 'name', 'clouds', 'rain', 'snow'))
+    decoded['weather'] = [_pick(weather[0], ('id', 'main', 'description', 'icon'))]
+    decoded['main'] = _pick(data['main'], ('temp', 'feels_like', 'temp_min', 'temp_max', 'pressure', 'humidity'))
+    decoded['wind'] = _pick(data.get('wind', {}), ('speed', 'deg'))
+    if 'sys' in data:
+        decoded['sys'] = _pick(data['sys'], ('country', 'sunrise', 'sunset'))
+    return decoded
+
+
+def decode_forecast(content):
+    """Decode a /forecast response straight into a ForecastFrame"""
+    return ForecastFrame.from_response(loads(content))
+
+
+def decode_air_quality(content):
+    """Keep only the current AQI reading"""
+    data = loads(content)
+    readings = data.get('list') or []
+    if not readings:
+        return {'list': []}
+    return {'list': [{'dt': readings[0].get('dt'), 'main': {'aqi': readings[0]['main']['aqi']}}]}
+
+
+DECODERS = {
+    'weather': decode_current_weather,
+    'forecast': decode_forecast,
+    'air_pollution': decode_air_quality,
+}
+
+
+def decode(endpoint, content):
+    """Decode an endpoint's response body into its compact representation"""
+    return DECODERS[endpoint](content)
@@ -0,0 +1,59 @@
+import threading
+
+
+class _Call:
+    """A single in-flight execution that other callers can wait on"""
+
+    def __init__(self, context=None):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.context = context          # leader-supplied state followers may act on
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key, fn, *args, timeout=None, context=None, on_join=None, **kwargs):
+        """Run fn once per key at a time; concurrent callers share its result or error"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call(context)
+                self._calls[key] = call
+                self.executions += 1
+            else:
+                self.shared += 1
+
+        # Lets a follower act on the leader's state, e.g. raise its request's priority
+        if not leader and on_join is not None:
+            on_join(call.context)
+
+        if leader:
+            try:
+                call.result = fn(*args, **kwargs)
+            except BaseException as e:
+                call.error = e
+            finally:
+                # Forget the call before waking followers so later callers start fresh
+                with self._lock:
+                    del self._calls[key]
+                call.event.set()
+        elif not call.event.wait(timeout):
+            raise TimeoutError(f"Timed out waiting for in-flight request {key!r}")
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self):
+        """Number of keys currently being fetched"""
+        with self._lock:
+            return len(self._calls)
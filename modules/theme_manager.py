@@ -1,56 +1,440 @@
+import hashlib
+import json
+import zlib
+from functools import lru_cache
 import streamlit as st
+import streamlit.components.v1 as components
 from config import Config
+from modules.asset_pipeline import AssetPipeline
+from modules.icon_cache import IconCache
+
+# Attribute set on the page root for an explicit theme; absent means "Auto"
+THEME_ATTRIBUTE = 'data-weather-theme'
+STYLE_ID_PREFIX = 'weather-app-css-'
+BACKGROUND_STYLE_ID = 'weather-app-background'
+ICON_STYLE_ID = 'weather-app-icons'
+
+# Viewport widths up to which each background width is used
+BACKGROUND_BREAKPOINTS = {640: 700, 1280: 1400}
 
 class ThemeManager:
     @staticmethod
-    def get_css():
-        """Get CSS with background image and modern styling"""
-        background_image = Config.BACKGROUND_IMAGE
-        
+    def _theme_slug(theme):
+        return theme.lower().replace(' ', '-')
+
+    @staticmethod
+    def _variables(theme):
+        """CSS custom properties for one theme"""
+        return '\n'.join(f"--wx-{name}: {value};" for name, value in Config.THEMES[theme].items())
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def get_stylesheet():
+        """Compile every theme and semantic class into one stylesheet, once per process"""
+        themes = '\n'.join(
+            f":root[{THEME_ATTRIBUTE}=\"{ThemeManager._theme_slug(theme)}\"] {{\n{ThemeManager._variables(theme)}\n}}"
+            for theme in Config.THEMES
+        )
+
         return f"""
-        <style>
-            /* Main app with background image */
+            /* Themes: Light by default, Dark when the OS asks for it under "Auto" */
+            :root {{
+                {ThemeManager._variables('Light')}
+            }}
+
+            @media (prefers-color-scheme: dark) {{
+                :root:not([{THEME_ATTRIBUTE}]) {{
+                    {ThemeManager._variables('Dark')}
+                }}
+            }}
+
+            {themes}
+
+            /* Main app; the background image itself comes from get_background_css */
             .stApp {{
-                background: linear-gradient(rgba(255, 255, 255, 0.92), rgba(255, 255, 255, 0.94)), 
-                            url('{background_image}');
+                background-image: linear-gradient(var(--wx-overlay), var(--wx-overlay));
                 background-size: cover;
                 background-position: center;
                 background-attachment: fixed;
                 background-repeat: no-repeat;
+                color: var(--wx-text-primary);
             }}
-            
+
             /* Weather cards */
             .weather-card {{
-                background: {Config.COLORS['card_bg']};
+                background: var(--wx-card-bg);
                 border-radius: 20px;
                 padding: 30px;
                 margin: 20px 0;
-                box-shadow: 0 10px 30px rgba(0, 0, 0, 0.12);
-                border: 1px solid rgba(0,0,0,0.08);
+                box-shadow: 0 10px 30px var(--wx-shadow);
+                border: 1px solid var(--wx-border);
                 backdrop-filter: blur(10px);
             }}
-            
+
+            /* Page chrome */
+            .app-header {{
+                text-align: center;
+                padding: 20px 0 30px 0;
+            }}
+
+            .app-header h1 {{
+                color: var(--wx-text-primary);
+                margin-bottom: 10px;
+                font-size: 42px;
+                font-weight: 800;
+            }}
+
+            .app-header p {{
+                color: var(--wx-text-secondary);
+                margin: 0;
+                font-size: 18px;
+            }}
+
+            .app-clock {{
+                text-align: right;
+                padding: 20px 0;
+                color: var(--wx-text-secondary);
+                margin: 0;
+                font-size: 16px;
+                font-weight: 500;
+            }}
+
+            .field-label {{
+                margin: 20px 0 10px 0;
+                color: var(--wx-text-secondary);
+                font-size: 14px;
+                font-weight: 600;
+            }}
+
+            .sidebar-title {{
+                text-align: center;
+                padding: 10px 0 20px 0;
+            }}
+
+            .sidebar-title h3 {{
+                color: var(--wx-primary);
+                margin: 0;
+            }}
+
+            .app-footer {{
+                text-align: center;
+                padding: 20px 0;
+                color: var(--wx-text-secondary);
+            }}
+
+            .app-footer p {{
+                margin: 0 0 8px 0;
+                font-weight: 500;
+                font-size: 14px;
+            }}
+
+            .app-footer p.fine-print {{
+                margin: 0;
+                font-size: 12px;
+                opacity: 0.8;
+            }}
+
+            .app-footer a {{
+                color: var(--wx-primary);
+                text-decoration: none;
+            }}
+
+            .section-title {{
+                margin: 30px 0 20px 0;
+            }}
+
+            .section-title h3 {{
+                color: var(--wx-text-primary);
+                font-size: 28px;
+                font-weight: 700;
+            }}
+
+            /* Current weather */
+            .current-location {{
+                text-align: center;
+                color: var(--wx-text-primary);
+                margin: 0;
+                font-size: 32px;
+                font-weight: 700;
+            }}
+
+            .current-main {{
+                display: flex;
+                justify-content: center;
+                align-items: center;
+                gap: 20px;
+                margin: 20px 0 40px 0;
+            }}
+
+            .current-temp {{
+                font-size: 72px;
+                font-weight: 300;
+                color: var(--wx-text-primary);
+                line-height: 1;
+            }}
+
+            .current-desc {{
+                color: var(--wx-text-secondary);
+                font-size: 20px;
+                margin: 5px 0;
+            }}
+
+            /* Metric tiles */
+            .metric-grid {{
+                display: grid;
+                grid-template-columns: repeat(3, 1fr);
+                gap: 30px 20px;
+            }}
+
+            .metric-tile {{
+                padding: 20px;
+                background: var(--wx-tile-bg);
+                border: 1px solid var(--wx-border);
+                border-radius: 12px;
+            }}
+
+            .metric-head {{
+                display: flex;
+                align-items: center;
+                gap: 10px;
+                margin-bottom: 10px;
+                font-size: 24px;
+            }}
+
+            .metric-label {{
+                color: var(--wx-text-secondary);
+                margin: 0;
+                font-size: 16px;
+                font-weight: 500;
+            }}
+
+            .metric-value {{
+                color: var(--wx-primary);
+                margin: 0;
+                font-size: 28px;
+                font-weight: 700;
+            }}
+
+            .metric-value.compact {{
+                font-size: 24px;
+            }}
+
+            /* Forecast strips */
+            .forecast-strip {{
+                display: grid;
+                grid-template-columns: repeat(var(--columns, 7), minmax(0, 1fr));
+                gap: 10px;
+            }}
+
+            .forecast-cell {{
+                text-align: center;
+                padding: 15px 10px;
+            }}
+
+            .forecast-cell .weather-icon {{
+                margin: 15px auto;
+            }}
+
+            /* Icons; the image for each .icon-<code> comes from the icon sprite */
+            .weather-icon {{
+                display: block;
+                width: 60px;
+                height: 60px;
+                background-size: contain;
+                background-repeat: no-repeat;
+                background-position: center;
+            }}
+
+            .weather-icon.large {{
+                width: 120px;
+                height: 120px;
+            }}
+
+            .forecast-time {{
+                font-weight: 600;
+                margin: 0;
+                color: var(--wx-text-primary);
+                font-size: 18px;
+            }}
+
+            .forecast-temp {{
+                font-size: 24px;
+                margin: 10px 0;
+                color: var(--wx-primary);
+                font-weight: 700;
+            }}
+
+            .forecast-desc {{
+                color: var(--wx-text-secondary);
+                margin: 5px 0;
+                font-size: 14px;
+            }}
+
+            .daily-grid {{
+                display: grid;
+                grid-template-columns: 1.5fr 1.5fr 2fr 2fr 1fr;
+                align-items: center;
+                column-gap: 10px;
+            }}
+
+            .daily-grid > div {{
+                padding: 15px 0;
+            }}
+
+            .daily-grid hr {{
+                grid-column: 1 / -1;
+                margin: 15px 0;
+                border-color: var(--wx-separator);
+            }}
+
+            .daily-day, .daily-weather {{
+                font-weight: 600;
+                margin: 0;
+                color: var(--wx-text-primary);
+                font-size: 18px;
+            }}
+
+            .daily-day {{
+                font-weight: 700;
+            }}
+
+            .daily-temp {{
+                font-size: 22px;
+                font-weight: 700;
+                margin: 0;
+                color: var(--wx-primary);
+            }}
+
+            .daily-range {{
+                color: var(--wx-text-secondary);
+                margin: 5px 0 0 0;
+                font-size: 14px;
+            }}
+
+            .daily-precip {{
+                text-align: center;
+                margin: 0;
+                font-size: 16px;
+                font-weight: 700;
+                color: var(--wx-secondary);
+                background: var(--wx-rain-bg);
+                border-radius: 10px;
+                padding: 8px 12px;
+            }}
+
+            .daily-precip.dry {{
+                color: var(--wx-warning);
+                background: none;
+                font-weight: 600;
+            }}
+
+            /* Air quality */
+            .aqi-badge {{
+                text-align: center;
+                padding: 25px;
+                background: color-mix(in srgb, var(--aqi-color) 8%, transparent);
+                border-radius: 16px;
+                border-left: 6px solid var(--aqi-color);
+            }}
+
+            .aqi-emoji {{
+                font-size: 48px;
+                margin-bottom: 15px;
+            }}
+
+            .aqi-value {{
+                font-size: 42px;
+                font-weight: 700;
+                color: var(--aqi-color);
+                margin-bottom: 10px;
+            }}
+
+            .aqi-label {{
+                color: var(--wx-text-primary);
+                font-size: 20px;
+                font-weight: 600;
+            }}
+
+            .aqi-advice {{
+                padding: 30px;
+                background: var(--wx-panel-bg);
+                border-radius: 16px;
+                color: var(--wx-text-primary);
+            }}
+
+            .aqi-advice h4 {{
+                color: var(--wx-text-primary);
+                margin-bottom: 15px;
+                font-size: 22px;
+            }}
+
+            .aqi-advice p {{
+                margin: 0 0 20px 0;
+                font-size: 16px;
+                line-height: 1.6;
+            }}
+
+            .aqi-level {{
+                display: flex;
+                justify-content: space-between;
+                margin-top: 20px;
+                font-weight: 600;
+                color: var(--wx-text-secondary);
+            }}
+
+            .aqi-level span:last-child {{
+                color: var(--aqi-color);
+            }}
+
+            .aqi-meter {{
+                background: var(--wx-separator);
+                height: 12px;
+                border-radius: 6px;
+                overflow: hidden;
+                margin: 10px 0 20px 0;
+            }}
+
+            .aqi-meter > div {{
+                height: 100%;
+                background: var(--aqi-color);
+            }}
+
+            /* Data age badge */
+            .data-age {{
+                text-align: right;
+                margin: 0 0 10px 0;
+            }}
+
+            .data-age span {{
+                background: color-mix(in srgb, var(--wx-primary) 10%, transparent);
+                color: var(--wx-primary);
+                padding: 6px 14px;
+                border-radius: 12px;
+                font-size: 13px;
+                font-weight: 600;
+            }}
+
             /* Input fields */
             .stTextInput > div > div > input {{
-                background: rgba(255, 255, 255, 0.95) !important;
-                color: {Config.COLORS['text_primary']} !important;
-                border: 2px solid {Config.COLORS['primary']} !important;
+                background: var(--wx-panel-bg) !important;
+                color: var(--wx-text-primary) !important;
+                border: 2px solid var(--wx-primary) !important;
                 border-radius: 15px !important;
                 padding: 15px 25px !important;
                 font-size: 16px !important;
                 height: 55px !important;
-                box-shadow: 0 4px 12px rgba(0,0,0,0.08);
+                box-shadow: 0 4px 12px var(--wx-shadow);
                 transition: all 0.3s ease !important;
             }}
-            
+
             .stTextInput > div > div > input:focus {{
-                box-shadow: 0 0 0 3px rgba(26, 115, 232, 0.2) !important;
-                border-color: {Config.COLORS['secondary']} !important;
+                box-shadow: 0 0 0 3px color-mix(in srgb, var(--wx-primary) 20%, transparent) !important;
+                border-color: var(--wx-secondary) !important;
             }}
-            
+
             /* Primary buttons */
             .stButton > button {{
-                background: linear-gradient(135deg, {Config.COLORS['primary']}, {Config.COLORS['secondary']}) !important;
+                background: linear-gradient(135deg, var(--wx-primary), var(--wx-secondary)) !important;
                 color: white !important;
                 border: none !important;
                 border-radius: 15px !important;
@@ -59,78 +443,222 @@ class ThemeManager:
                 font-size: 15px !important;
                 transition: all 0.3s ease !important;
                 height: 55px !important;
-                box-shadow: 0 6px 20px rgba(26, 115, 232, 0.3);
+                box-shadow: 0 6px 20px color-mix(in srgb, var(--wx-primary) 30%, transparent);
             }}
-            
+
             .stButton > button:hover {{
                 transform: translateY(-3px) !important;
-                box-shadow: 0 8px 25px rgba(26, 115, 232, 0.4) !important;
-                background: linear-gradient(135deg, {Config.COLORS['secondary']}, {Config.COLORS['primary']}) !important;
+                box-shadow: 0 8px 25px color-mix(in srgb, var(--wx-primary) 40%, transparent) !important;
+                background: linear-gradient(135deg, var(--wx-secondary), var(--wx-primary)) !important;
             }}
-            
+
             /* Tabs */
             .stTabs [data-baseweb="tab-list"] {{
                 gap: 8px;
-                background: rgba(255, 255, 255, 0.9);
+                background: var(--wx-panel-bg);
                 padding: 10px;
                 border-radius: 15px;
                 margin: 30px 0;
-                box-shadow: 0 4px 12px rgba(0,0,0,0.05);
+                box-shadow: 0 4px 12px var(--wx-shadow);
             }}
-            
+
             .stTabs [data-baseweb="tab"] {{
-                background: rgba(255, 255, 255, 0.9);
-                color: {Config.COLORS['text_primary']} !important;
+                background: var(--wx-panel-bg);
+                color: var(--wx-text-primary) !important;
                 border-radius: 12px;
                 padding: 12px 28px;
                 font-weight: 500;
                 font-size: 14px;
-                border: 1px solid rgba(0,0,0,0.08);
+                border: 1px solid var(--wx-border);
                 transition: all 0.3s ease;
             }}
-            
+
             .stTabs [aria-selected="true"] {{
-                background: linear-gradient(135deg, {Config.COLORS['primary']}, {Config.COLORS['secondary']}) !important;
+                background: linear-gradient(135deg, var(--wx-primary), var(--wx-secondary)) !important;
                 color: white !important;
-                border-color: {Config.COLORS['primary']} !important;
-                box-shadow: 0 4px 12px rgba(26, 115, 232, 0.3);
+                border-color: var(--wx-primary) !important;
+                box-shadow: 0 4px 12px color-mix(in srgb, var(--wx-primary) 30%, transparent);
             }}
-            
+
             /* Hide Streamlit elements */
             #MainMenu {{visibility: hidden;}}
             footer {{visibility: hidden;}}
             header {{visibility: hidden;}}
-            
+
             /* Custom scrollbar */
             ::-webkit-scrollbar {{
                 width: 10px;
                 height: 10px;
             }}
-            
+
             ::-webkit-scrollbar-track {{
-                background: rgba(0,0,0,0.05);
+                background: var(--wx-separator);
                 border-radius: 10px;
             }}
-            
+
             ::-webkit-scrollbar-thumb {{
-                background: {Config.COLORS['primary']};
+                background: var(--wx-primary);
                 border-radius: 10px;
             }}
-            
+
             ::-webkit-scrollbar-thumb:hover {{
-                background: {Config.COLORS['secondary']};
+                background: var(--wx-secondary);
             }}
-            
+
             /* Responsive design */
             @media (max-width: 768px) {{
                 .weather-card {{
                     padding: 20px;
                     margin: 10px 0;
                 }}
-                
+
+                .metric-grid {{
+                    grid-template-columns: repeat(2, 1fr);
+                }}
+
                 .folium-map {{
                     height: 300px !important;
                 }}
             }}
-        </style>
-        """
\ No newline at end of file
+        """
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def stylesheet_hash():
+        return hashlib.blake2b(ThemeManager.get_stylesheet().encode(), digest_size=8).hexdigest()
+
+    @staticmethod
+    def pick_background(weather_data=None, location=None):
+        """Name of the built background matching the conditions, or None"""
+        weather = (weather_data or {}).get('weather') or [{}]
+        icon = weather[0].get('icon', '01d')
+        if icon.endswith('n'):
+            mood = 'night'
+        elif weather[0].get('main', 'Clear') != 'Clear':
+            mood = 'cloudy'
+        else:
+            mood = 'day'
+
+        stems = AssetPipeline.default().stems(mood)
+        if not stems:
+            return None
+        # Stable per location, so reruns don't flip between pictures
+        return stems[zlib.crc32((location or '').encode()) % len(stems)]
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def get_background_css(stem=None):
+        """Background rule for one built image, sized by viewport and typed by format"""
+        variants = AssetPipeline.default().variants(stem) if stem else {}
+        overlay = 'linear-gradient(var(--wx-overlay), var(--wx-overlay))'
+        if not variants:
+            return f".stApp {{ background-image: {overlay}, url('{Config.BACKGROUND_IMAGE}'); }}"
+
+        def rule(sources):
+            fallback = sources[-1][0]
+            image_set = ', '.join(f'url("{url}") type("{mime}")' for url, mime in sources)
+            # Browsers without image-set() type() support keep the first declaration
+            return (
+                f".stApp {{ background-image: {overlay}, url('{fallback}'); "
+                f"background-image: {overlay}, image-set({image_set}); }}"
+            )
+
+        widths = sorted(variants, reverse=True)
+        rules = [rule(variants[widths[0]])]
+        for width in widths[1:]:
+            breakpoint = BACKGROUND_BREAKPOINTS.get(width, width)
+            rules.append(f"@media (max-width: {breakpoint}px) {{ {rule(variants[width])} }}")
+        return '\n'.join(rules)
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _stylesheet_injector():
+        """Script that installs the stylesheet, replacing any older version"""
+        style_id = STYLE_ID_PREFIX + ThemeManager.stylesheet_hash()
+        return f"""
+        <script>
+            const doc = window.parent.document;
+            const styleId = {json.dumps(style_id)};
+            if (!doc.getElementById(styleId)) {{
+                doc.querySelectorAll('style[id^="{STYLE_ID_PREFIX}"]').forEach((el) => el.remove());
+                const style = doc.createElement('style');
+                style.id = styleId;
+                style.textContent = {json.dumps(ThemeManager.get_stylesheet())};
+                doc.head.appendChild(style);
+            }}
+        </script>
+        """
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _style_injector(element_id, css):
+        """Script that sets the content of one named style element"""
+        return f"""
+        <script>
+            const doc = window.parent.document;
+            let style = doc.getElementById({json.dumps(element_id)});
+            if (!style) {{
+                style = doc.createElement('style');
+                style.id = {json.dumps(element_id)};
+                doc.head.appendChild(style);
+            }}
+            style.textContent = {json.dumps(css)};
+        </script>
+        """
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _theme_injector(theme):
+        """Script that applies a theme to the page root"""
+        slug = None if theme == 'Auto' else ThemeManager._theme_slug(theme)
+        return f"""
+        <script>
+            const root = window.parent.document.documentElement;
+            const theme = {json.dumps(slug)};
+            if (theme) {{
+                root.setAttribute('{THEME_ATTRIBUTE}', theme);
+            }} else {{
+                root.removeAttribute('{THEME_ATTRIBUTE}');
+            }}
+        </script>
+        """
+
+    @staticmethod
+    def _run_script(script):
+        if hasattr(st, 'iframe'):
+            st.iframe(script, height='content')
+        else:
+            components.html(script, height=0)
+
+    @staticmethod
+    def _apply(parts):
+        """Send each part whose version differs from the one this session already has"""
+        # part -> (version, script builder); the icon sprite and the background
+        # change independently of the ~15 KB stylesheet, so they travel alone
+        applied = st.session_state.setdefault('applied_styles', {})
+        for part, (version, build) in parts.items():
+            if applied.get(part) != version:
+                ThemeManager._run_script(build())
+                applied[part] = version
+
+    @staticmethod
+    def inject(theme='Auto'):
+        """Install the stylesheet, theme and icon sprite, before anything slow renders"""
+        if theme != 'Auto' and theme not in Config.THEMES:
+            theme = 'Auto'
+        icons = IconCache.default()
+        ThemeManager._apply({
+            'stylesheet': (ThemeManager.stylesheet_hash(), ThemeManager._stylesheet_injector),
+            'theme': (theme, lambda: ThemeManager._theme_injector(theme)),
+            'icons': (icons.sprite_hash(), lambda: ThemeManager._style_injector(ICON_STYLE_ID, icons.sprite_css())),
+        })
+
+    @staticmethod
+    def inject_background(weather_data=None, location=None):
+        """Install the background matching the conditions, once they are known"""
+        background = ThemeManager.pick_background(weather_data, location)
+        ThemeManager._apply({
+            'background': (background, lambda: ThemeManager._style_injector(
+                BACKGROUND_STYLE_ID, ThemeManager.get_background_css(background)
+            )),
+        })
@@ -0,0 +1,273 @@
+import itertools
+import math
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import Config
+from modules.gazetteer import Gazetteer
+from modules.single_flight import SingleFlight
+
+TILE_PATH = re.compile(r'^/tiles/(\d+)/(\d+)/(\d+)\.png$')
+
+
+def tile_for(lat, lon, zoom):
+    """Web Mercator tile (x, y) containing a point"""
+    n = 2 ** zoom
+    lat = max(min(lat, 85.0511), -85.0511)
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+class TileStore:
+    """On-disk z/x/y.png tile cache, evicting least recently used tiles past a size limit"""
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # (z, x, y) -> size, least recently used first
+        self.bytes = 0
+        self.evictions = 0
+        os.makedirs(root, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """Rebuild the LRU order from file modification times after a restart"""
+        found = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                parts = os.path.relpath(path, self.root).split(os.sep)
+                if len(parts) != 3 or not filename.endswith('.png'):
+                    continue
+                try:
+                    key = (int(parts[0]), int(parts[1]), int(parts[2][:-4]))
+                    stat = os.stat(path)
+                except (OSError, ValueError):
+                    continue
+                found.append((stat.st_mtime, key, stat.st_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.bytes += size
+
+    def path(self, z, x, y):
+        return os.path.join(self.root, str(z), str(x), f"{y}.png")
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, z, x, y):
+        key = (z, x, y)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+
+        path = self.path(z, x, y)
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.bytes -= self._entries.pop(key, 0)
+            return None
+        return content
+
+    def put(self, z, x, y, content):
+        path = self.path(z, x, y)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(content)
+        os.replace(path + '.tmp', path)
+
+        evicted = []
+        with self._lock:
+            self.bytes -= self._entries.pop((z, x, y), 0)
+            self._entries[(z, x, y)] = len(content)
+            self.bytes += len(content)
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                key, size = self._entries.popitem(last=False)
+                self.bytes -= size
+                self.evictions += 1
+                evicted.append(key)
+
+        for key in evicted:
+            try:
+                os.remove(self.path(*key))
+            except OSError:
+                pass
+
+
+class _TileHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        match = TILE_PATH.match(self.path.split('?')[0])
+        if not match:
+            self.send_error(404)
+            return
+
+        z, x, y = (int(part) for part in match.groups())
+        if z > Config.TILE_MAX_ZOOM or x >= 2 ** z or y >= 2 ** z:
+            self.send_error(404)
+            return
+
+        try:
+            content = self.server.proxy.tile(z, x, y)
+        except Exception as e:
+            print(f"Tile proxy error for {z}/{x}/{y}: {str(e)}")
+            self.send_error(502)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('Cache-Control', f"public, max-age={Config.TILE_BROWSER_MAX_AGE}")
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TileProxy:
+    """Local tile endpoint backed by a TileStore, filling misses from the upstream tile server"""
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, upstream=None, store=None, host=None, port=None, public_url=None):
+        self.upstream = upstream or Config.TILE_UPSTREAM_URL
+        self.store = store if store is not None else TileStore(Config.TILE_CACHE_DIR, Config.TILE_CACHE_MAX_BYTES)
+        self.host = host or Config.TILE_PROXY_HOST
+        self.port = Config.TILE_PROXY_PORT if port is None else port
+        self.public_url = public_url or Config.TILE_PROXY_PUBLIC_URL
+
+        self._flight = SingleFlight()
+        self._subdomains = itertools.cycle(Config.TILE_UPSTREAM_SUBDOMAINS)
+        self._server = None
+        self._seed_queue = queue.Queue()
+        self._seeded = set()
+        self._seeded_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.seeded = 0
+
+    @classmethod
+    def start_default(cls):
+        """Start the process-wide proxy once, seeding tiles around the Popular Cities"""
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    proxy = cls()
+                    proxy.start()
+                    proxy.seed_names(Config.POPULAR_CITIES)
+                    cls._default = proxy
+        return cls._default
+
+    def start(self):
+        if self._server is None:
+            self._server = ThreadingHTTPServer((self.host, self.port), _TileHandler)
+            self._server.daemon_threads = True
+            self._server.proxy = self
+            self.port = self._server.server_address[1]
+            threading.Thread(target=self._server.serve_forever, name="tile-proxy", daemon=True).start()
+            threading.Thread(target=self._seed_loop, name="tile-seed", daemon=True).start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def tile_url(self):
+        """Leaflet URL template the browser requests tiles from"""
+        if self.public_url:
+            return self.public_url
+        return f"http://{self.host}:{self.port}/tiles/{{z}}/{{x}}/{{y}}.png"
+
+    def tile(self, z, x, y):
+        content = self.store.get(z, x, y)
+        if content is not None:
+            self.hits += 1
+            return content
+        self.misses += 1
+        return self._flight.do((z, x, y), self._fetch, z, x, y, timeout=Config.SINGLE_FLIGHT_TIMEOUT)
+
+    def _fetch(self, z, x, y):
+        # Imported here so the proxy doesn't pull in the API module at import time
+        from modules.weather_api import WeatherAPI
+
+        url = self.upstream.format(s=next(self._subdomains), z=z, x=x, y=y)
+        response = WeatherAPI.get_session().get(url, timeout=Config.HTTP_TIMEOUT)
+        response.raise_for_status()
+        self.store.put(z, x, y, response.content)
+        return response.content
+
+    def seed_point(self, lat, lon, zooms=None, radius=None):
+        """Queue the tiles around a point at the zoom levels the map opens on"""
+        if zooms is None:
+            span = Config.TILE_SEED_ZOOM_SPAN
+            zooms = range(max(Config.MAP_ZOOM - span, 0), min(Config.MAP_ZOOM + span, Config.TILE_MAX_ZOOM) + 1)
+        radius = Config.TILE_SEED_RADIUS if radius is None else radius
+
+        with self._seeded_lock:
+            key = (round(lat, 2), round(lon, 2), tuple(zooms), radius)
+            if key in self._seeded:
+                return 0
+            self._seeded.add(key)
+
+        count = 0
+        for z in zooms:
+            cx, cy = tile_for(lat, lon, z)
+            n = 2 ** z
+            for x in range(cx - radius, cx + radius + 1):
+                for y in range(max(cy - radius, 0), min(cy + radius, n - 1) + 1):
+                    self._seed_queue.put((z, x % n, y))
+                    count += 1
+        return count
+
+    def seed_names(self, names):
+        """Seed locations by name, using the offline gazetteer to place them"""
+        count = 0
+        gazetteer = Gazetteer.default()
+        for name in names:
+            match = gazetteer.resolve(name)
+            if match:
+                count += self.seed_point(match[0], match[1])
+        return count
+
+    def _seed_loop(self):
+        while True:
+            z, x, y = self._seed_queue.get()
+            if (z, x, y) in self.store:
+                continue
+            try:
+                self._flight.do((z, x, y), self._fetch, z, x, y, timeout=Config.SINGLE_FLIGHT_TIMEOUT)
+                self.seeded += 1
+            except Exception as e:
+                print(f"Tile seed error for {z}/{x}/{y}: {str(e)}")
+            time.sleep(Config.TILE_SEED_DELAY)
+
+    def stats(self):
+        return {
+            'tiles': len(self.store),
+            'bytes': self.store.bytes,
+            'evictions': self.store.evictions,
+            'hits': self.hits,
+            'misses': self.misses,
+            'seeded': self.seeded,
+            'queued': self._seed_queue.qsize(),
+        }
@@ -1,23 +1,23 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
-import plotly.graph_objects as go
+import json
 from config import Config
+from modules.chart_pipeline import ChartPipeline
+from modules.gazetteer import Gazetteer
+from modules.history_store import HistoryStore
+from modules.html_renderer import HtmlRenderer, escape
+from modules.icon_cache import normalize_icon
+from modules import ui_templates as templates
 
 class UIManager:
+    # Section HTML is memoized by content, so every session reuses it
+    _renderer = HtmlRenderer()
+    _charts = ChartPipeline()
+    
     @staticmethod
     def display_app_header():
         """Display app header"""
-        st.markdown(f"""
-        <div style="text-align: center; padding: 20px 0 30px 0;">
-            <h1 style="color: {Config.COLORS['text_primary']}; margin-bottom: 10px; font-size: 42px; font-weight: 800;">
-                🌤️ Weather Forecast
-            </h1>
-            <p style="color: {Config.COLORS['text_secondary']}; margin: 0; font-size: 18px;">
-                Real-time weather updates & forecasts
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(templates.APP_HEADER.substitute(), unsafe_allow_html=True)
     
     @staticmethod
     def display_search_section():
@@ -40,13 +40,21 @@ class UIManager:
             if st.button("📍 Current", use_container_width=True, key="current_btn"):
                 st.session_state.use_current_location = True
         
+        # Offline suggestions for the typed text
+        if search_query and not search_clicked:
+            suggestions = Gazetteer.default().suggest(search_query, limit=5)
+            if suggestions:
+                cols = st.columns(len(suggestions))
+                for idx, city in enumerate(suggestions):
+                    with cols[idx]:
+                        if st.button(f"📍 {city['address']}", key=f"suggest_{city['id']}", use_container_width=True):
+                            st.session_state.quick_location = city['address']
+        
         # Quick locations
-        st.markdown('<div style="margin: 20px 0 10px 0;">', unsafe_allow_html=True)
-        st.markdown('<p style="color: #5f6368; font-size: 14px; font-weight: 600;">Popular Cities:</p>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+        st.markdown(templates.FIELD_LABEL.substitute(label='Popular Cities:'), unsafe_allow_html=True)
         
-        locations = ["Karachi", "Lahore", "Islamabad", "Mumbai", "Delhi", "Dubai", "London", "New York"]
-        cols = st.columns(8)
+        locations = Config.POPULAR_CITIES
+        cols = st.columns(len(locations))
         
         for idx, loc in enumerate(locations):
             with cols[idx]:
@@ -55,6 +63,18 @@ class UIManager:
         
         return search_query if search_clicked else None
     
+    @staticmethod
+    def display_data_age(fetched_at, refreshing=False):
+        """Display how old the data on screen is"""
+        if not fetched_at:
+            return
+        
+        minutes = int((datetime.now() - fetched_at).total_seconds() // 60)
+        age = "just now" if minutes < 1 else f"{minutes} min ago"
+        status = " • 🔄 Refreshing..." if refreshing else ""
+        
+        st.markdown(templates.DATA_AGE.substitute(age=age, status=status), unsafe_allow_html=True)
+    
     @staticmethod
     def display_current_weather(weather_data, location):
         """Display current weather with icons"""
@@ -62,173 +82,51 @@ class UIManager:
             st.warning("Weather data not available")
             return
         
-        st.markdown('<div class="weather-card">', unsafe_allow_html=True)
-        
-        # Location header
-        col1, col2, col3 = st.columns([1, 2, 1])
-        
-        with col2:
-            st.markdown(f'<div style="text-align: center;"><h2 style="color: {Config.COLORS["text_primary"]}; margin: 0; font-size: 32px; font-weight: 700;">{location}</h2></div>', unsafe_allow_html=True)
-        
-        # Main weather display
-        temp = weather_data['main']['temp']
-        weather_desc = weather_data['weather'][0]['description'].title()
-        icon_code = weather_data['weather'][0]['icon']
-        icon_url = f"https://openweathermap.org/img/wn/{icon_code}@4x.png"
-        
-        col1, col2, col3 = st.columns([1, 2, 1])
-        
-        with col2:
-            st.markdown(f"""
-            <div style="text-align: center; margin: 20px 0;">
-                <div style="display: flex; justify-content: center; align-items: center; gap: 20px; margin-bottom: 20px;">
-                    <div>
-                        <div style="font-size: 72px; font-weight: 300; color: {Config.COLORS['text_primary']}; line-height: 1;">
-                            {temp:.1f}°C
-                        </div>
-                        <p style="color: {Config.COLORS['text_secondary']}; font-size: 20px; margin: 5px 0;">
-                            {weather_desc}
-                        </p>
-                    </div>
-                    <img src="{icon_url}" width="120">
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # Weather metrics grid
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            # Air Quality
-            st.markdown(f"""
-            <div style="margin-bottom: 30px; padding: 20px; background: rgba(26, 115, 232, 0.05); border-radius: 12px;">
-                <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 10px;">
-                    <span style="font-size: 24px;">🌫️</span>
-                    <p style="color: {Config.COLORS['text_secondary']}; margin: 0; font-size: 16px; font-weight: 500;">Air Quality</p>
-                </div>
-                <p style="color: {Config.COLORS['primary']}; margin: 0; font-size: 28px; font-weight: 700;">
-                    Moderate
-                </p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Wind Speed
-            wind_speed = weather_data['wind']['speed']
-            st.markdown(f"""
-            <div style="margin-bottom: 30px; padding: 20px; background: rgba(26, 115, 232, 0.05); border-radius: 12px;">
-                <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 10px;">
-                    <span style="font-size: 24px;">💨</span>
-                    <p style="color: {Config.COLORS['text_secondary']}; margin: 0; font-size: 16px; font-weight: 500;">Wind Speed</p>
-                </div>
-                <p style="color: {Config.COLORS['primary']}; margin: 0; font-size: 28px; font-weight: 700;">
-                    {wind_speed} km/h
-                </p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Humidity
-            humidity = weather_data['main']['humidity']
-            st.markdown(f"""
-            <div style="padding: 20px; background: rgba(26, 115, 232, 0.05); border-radius: 12px;">
-                <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 10px;">
-                    <span style="font-size: 24px;">💧</span>
-                    <p style="color: {Config.COLORS['text_secondary']}; margin: 0; font-size: 16px; font-weight: 500;">Humidity</p>
-                </div>
-                <p style="color: {Config.COLORS['primary']}; margin: 0; font-size: 28px; font-weight: 700;">
-                    {humidity}%
-                </p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            # Wind Direction
-            wind_deg = weather_data['wind'].get('deg', 0)
-            st.markdown(f"""
-            <div style="margin-bottom: 30px; padding: 20px; background: rgba(26, 115, 232, 0.05); border-radius: 12px;">
-                <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 10px;">
-                    <span style="font-size: 24px;">🧭</span>
-                    <p style="color: {Config.COLORS['text_secondary']}; margin: 0; font-size: 16px; font-weight: 500;">Wind Direction</p>
-                </div>
-                <p style="color: {Config.COLORS['primary']}; margin: 0; font-size: 28px; font-weight: 700;">
-                    {wind_deg}°
-                </p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Highest Temperature
-            temp_max = weather_data['main']['temp_max']
-            st.markdown(f"""
-            <div style="margin-bottom: 30px; padding: 20px; background: rgba(26, 115, 232, 0.05); border-radius: 12px;">
-                <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 10px;">
-                    <span style="font-size: 24px;">🌡️</span>
-                    <p style="color: {Config.COLORS['text_secondary']}; margin: 0; font-size: 16px; font-weight: 500;">High Temp</p>
-                </div>
-                <p style="color: {Config.COLORS['primary']}; margin: 0; font-size: 28px; font-weight: 700;">
-                    {temp_max:.1f}°C
-                </p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Visibility
-            visibility = weather_data.get('visibility', 10000) / 1000
-            st.markdown(f"""
-            <div style="padding: 20px; background: rgba(26, 115, 232, 0.05); border-radius: 12px;">
-                <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 10px;">
-                    <span style="font-size: 24px;">👁️</span>
-                    <p style="color: {Config.COLORS['text_secondary']}; margin: 0; font-size: 16px; font-weight: 500;">Visibility</p>
-                </div>
-                <p style="color: {Config.COLORS['primary']}; margin: 0; font-size: 28px; font-weight: 700;">
-                    {visibility:.1f} km
-                </p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            # Lowest Temperature
-            temp_min = weather_data['main']['temp_min']
-            st.markdown(f"""
-            <div style="margin-bottom: 30px; padding: 20px; background: rgba(26, 115, 232, 0.05); border-radius: 12px;">
-                <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 10px;">
-                    <span style="font-size: 24px;">🌡️</span>
-                    <p style="color: {Config.COLORS['text_secondary']}; margin: 0; font-size: 16px; font-weight: 500;">Low Temp</p>
-                </div>
-                <p style="color: {Config.COLORS['primary']}; margin: 0; font-size: 28px; font-weight: 700;">
-                    {temp_min:.1f}°C
-                </p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Pressure
-            pressure = weather_data['main']['pressure']
-            st.markdown(f"""
-            <div style="margin-bottom: 30px; padding: 20px; background: rgba(26, 115, 232, 0.05); border-radius: 12px;">
-                <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 10px;">
-                    <span style="font-size: 24px;">🎈</span>
-                    <p style="color: {Config.COLORS['text_secondary']}; margin: 0; font-size: 16px; font-weight: 500;">Pressure</p>
-                </div>
-                <p style="color: {Config.COLORS['primary']}; margin: 0; font-size: 28px; font-weight: 700;">
-                    {pressure} hPa
-                </p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Sunrise & Sunset
-            if 'sys' in weather_data:
-                sunrise = datetime.fromtimestamp(weather_data['sys']['sunrise']).strftime('%H:%M')
-                sunset = datetime.fromtimestamp(weather_data['sys']['sunset']).strftime('%H:%M')
-                st.markdown(f"""
-                <div style="padding: 20px; background: rgba(26, 115, 232, 0.05); border-radius: 12px;">
-                    <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 10px;">
-                        <span style="font-size: 24px;">🌅</span>
-                        <p style="color: {Config.COLORS['text_secondary']}; margin: 0; font-size: 16px; font-weight: 500;">Sunrise / Sunset</p>
-                    </div>
-                    <p style="color: {Config.COLORS['primary']}; margin: 0; font-size: 24px; font-weight: 700;">
-                        {sunrise} / {sunset}
-                    </p>
-                </div>
-                """, unsafe_allow_html=True)
+        content = (location, weather_data['main'], weather_data['weather'][0], weather_data['wind'],
+                   weather_data.get('visibility'), weather_data.get('sys'))
+        html = UIManager._renderer.render('current_weather', content,
+                                          lambda: UIManager._render_current_weather(weather_data, location))
+        st.markdown(html, unsafe_allow_html=True)
+    
+    @staticmethod
+    def _render_current_weather(weather_data, location):
+        """Build the current weather card as one HTML block"""
+        main = weather_data['main']
+        weather = weather_data['weather'][0]
+        wind = weather_data['wind']
+        visibility = weather_data.get('visibility', 10000) / 1000
+        
+        # Grid fills row by row: Air Quality, Wind Direction, Low Temp, ...
+        metrics = [
+            ('🌫️', 'Air Quality', 'Moderate'),
+            ('🧭', 'Wind Direction', f"{wind.get('deg', 0)}°"),
+            ('🌡️', 'Low Temp', f"{main['temp_min']:.1f}°C"),
+            ('💨', 'Wind Speed', f"{wind['speed']} km/h"),
+            ('🌡️', 'High Temp', f"{main['temp_max']:.1f}°C"),
+            ('🎈', 'Pressure', f"{main['pressure']} hPa"),
+            ('💧', 'Humidity', f"{main['humidity']}%"),
+            ('👁️', 'Visibility', f"{visibility:.1f} km"),
+        ]
+        if 'sys' in weather_data:
+            sunrise = datetime.fromtimestamp(weather_data['sys']['sunrise']).strftime('%H:%M')
+            sunset = datetime.fromtimestamp(weather_data['sys']['sunset']).strftime('%H:%M')
+            metrics.append(('🌅', 'Sunrise / Sunset', f"{sunrise} / {sunset}", 'metric-value compact'))
+        
+        tiles = '\n'.join(
+            templates.METRIC_TILE.substitute(
+                emoji=metric[0], label=metric[1], value=metric[2],
+                value_class=metric[3] if len(metric) > 3 else 'metric-value'
+            )
+            for metric in metrics
+        )
         
-        st.markdown('</div>', unsafe_allow_html=True)
+        return templates.CURRENT_WEATHER.substitute(
+            location=escape(location),
+            temp=f"{main['temp']:.1f}",
+            description=escape(weather['description'].title()),
+            icon=normalize_icon(weather['icon']),
+            tiles=tiles,
+        )
     
     @staticmethod
     def display_7_hour_forecast(hourly_data):
@@ -237,37 +135,25 @@ class UIManager:
             st.info("Hourly forecast data not available")
             return
         
-        st.markdown('<div style="margin: 30px 0 20px 0;">', unsafe_allow_html=True)
-        st.markdown('<h3 style="color: #202124; font-size: 28px; font-weight: 700;">📅 Next 7 Hours</h3>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        st.markdown('<div class="weather-card">', unsafe_allow_html=True)
-        
-        # Create 7 columns for each hour
-        cols = st.columns(7)
-        
-        for idx, hour in enumerate(hourly_data[:7]):
-            with cols[idx]:
-                icon_url = f"https://openweathermap.org/img/wn/{hour['icon']}@2x.png"
-                
-                st.markdown(f"""
-                <div style="text-align: center; padding: 15px 10px;">
-                    <p style="font-weight: 600; margin: 0 0 15px 0; color: {Config.COLORS['text_primary']}; font-size: 18px;">
-                        {hour['time']}
-                    </p>
-                    <div style="margin: 15px 0;">
-                        <img src="{icon_url}" width="60">
-                    </div>
-                    <p style="font-size: 24px; margin: 10px 0; color: {Config.COLORS['primary']}; font-weight: 700;">
-                        {hour['temp']}°
-                    </p>
-                    <p style="color: {Config.COLORS['text_secondary']}; margin: 5px 0; font-size: 14px;">
-                        {hour['weather']}
-                    </p>
-                </div>
-                """, unsafe_allow_html=True)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+        hours = tuple(hourly_data[:7])
+        html = UIManager._renderer.render('hourly_forecast', hours,
+                                          lambda: UIManager._render_7_hour_forecast(hours))
+        st.markdown(html, unsafe_allow_html=True)
+    
+    @staticmethod
+    def _render_7_hour_forecast(hours):
+        """Build the hourly strip as one HTML block"""
+        cells = '\n'.join(
+            templates.HOURLY_CELL.substitute(
+                time=hour['time'],
+                icon=normalize_icon(hour['icon']),
+                temp=hour['temp'],
+                weather=escape(hour['weather']),
+            )
+            for hour in hours
+        )
+        header = templates.SECTION_HEADER.substitute(title='📅 Next 7 Hours')
+        return templates.HOURLY_FORECAST.substitute(header=header, count=len(hours), cells=cells)
     
     @staticmethod
     def display_daily_forecast(daily_data):
@@ -276,118 +162,58 @@ class UIManager:
             st.info("Daily forecast data not available")
             return
         
-        st.markdown('<div style="margin: 30px 0 20px 0;">', unsafe_allow_html=True)
-        st.markdown('<h3 style="color: #202124; font-size: 28px; font-weight: 700;">📆 7-Day Forecast</h3>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        st.markdown('<div class="weather-card">', unsafe_allow_html=True)
-        
-        # Create cards for each day
-        for idx, day in enumerate(daily_data[:7]):
-            col1, col2, col3, col4, col5 = st.columns([1.5, 1.5, 2, 2, 1])
-            
-            with col1:
-                day_name = day.get('day', 'N/A')
-                if idx == 0:
-                    day_name = "Today"
-                elif idx == 1:
-                    day_name = "Tomorrow"
-                
-                st.markdown(f'<div style="padding: 15px 0;"><p style="font-weight: 700; margin: 0; color: {Config.COLORS["text_primary"]}; font-size: 18px;">{day_name}</p></div>', unsafe_allow_html=True)
-            
-            with col2:
-                icon_url = f"https://openweathermap.org/img/wn/{day.get('icon', '01d')}@2x.png"
-                st.image(icon_url, width=60)
-            
-            with col3:
-                st.markdown(f'<div style="padding: 15px 0;"><p style="font-weight: 600; margin: 0; color: {Config.COLORS["text_primary"]}; font-size: 18px;">{day.get("weather", "N/A")}</p></div>', unsafe_allow_html=True)
-            
-            with col4:
-                temp = day.get('temp', 'N/A')
-                max_temp = day.get('max_temp', 'N/A')
-                min_temp = day.get('min_temp', 'N/A')
-                
-                st.markdown(f"""
-                <div style="padding: 15px 0;">
-                    <p style="font-size: 22px; font-weight: 700; margin: 0; color: {Config.COLORS['primary']};">
-                        {temp}°C
-                    </p>
-                    <p style="color: {Config.COLORS['text_secondary']}; margin: 5px 0 0 0; font-size: 14px;">
-                        H: {max_temp}° • L: {min_temp}°
-                    </p>
-                </div>
-                """, unsafe_allow_html=True)
+        days = tuple(daily_data[:7])
+        html = UIManager._renderer.render('daily_forecast', days,
+                                          lambda: UIManager._render_daily_forecast(days))
+        st.markdown(html, unsafe_allow_html=True)
+    
+    @staticmethod
+    def _render_daily_forecast(days):
+        """Build the 7-day list as one HTML block"""
+        rows = []
+        for idx, day in enumerate(days):
+            day_name = day.get('day', 'N/A')
+            if idx == 0:
+                day_name = "Today"
+            elif idx == 1:
+                day_name = "Tomorrow"
             
-            with col5:
-                precipitation = day.get('precipitation', 0)
-                if precipitation > 0:
-                    st.markdown(f"""
-                    <div style="padding: 15px 0; text-align: center;">
-                        <div style="background: rgba(52, 168, 83, 0.15); border-radius: 10px; padding: 8px 12px;">
-                            <p style="color: #34a853; margin: 0; font-weight: 700; font-size: 16px;">🌧️ {precipitation}%</p>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.markdown('<div style="padding: 15px 0; text-align: center;"><p style="color: #fbbc04; margin: 0; font-size: 16px; font-weight: 600;">☀️ 0%</p></div>', unsafe_allow_html=True)
+            precipitation = day.get('precipitation', 0)
+            if precipitation > 0:
+                precipitation_html = templates.DAILY_RAIN.substitute(precipitation=precipitation)
+            else:
+                precipitation_html = templates.DAILY_DRY.substitute()
             
-            if idx < 6:
-                st.markdown('<hr style="margin: 15px 0; border-color: rgba(0,0,0,0.1);">', unsafe_allow_html=True)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+            rows.append(templates.DAILY_ROW.substitute(
+                day=day_name,
+                icon=normalize_icon(day.get('icon')),
+                weather=escape(day.get('weather', 'N/A')),
+                temp=day.get('temp', 'N/A'),
+                max_temp=day.get('max_temp', 'N/A'),
+                min_temp=day.get('min_temp', 'N/A'),
+                precipitation=precipitation_html,
+            ))
+        
+        header = templates.SECTION_HEADER.substitute(title='📆 7-Day Forecast')
+        return templates.DAILY_FORECAST.substitute(header=header, rows=('\n' + templates.DAILY_SEPARATOR + '\n').join(rows))
     
     @staticmethod
-    def display_temperature_chart(hourly_data):
-        """Display temperature chart"""
-        if not hourly_data or len(hourly_data) < 3:
+    def display_trend_chart(forecast, lat, lon, theme='Auto'):
+        """Display observed history and the full forecast for a location on shared time axes"""
+        if forecast is None or len(forecast) < 3:
             return
         
-        st.markdown('<div style="margin: 30px 0 20px 0;">', unsafe_allow_html=True)
-        st.markdown('<h3 style="color: #202124; font-size: 28px; font-weight: 700;">📊 Temperature Trend</h3>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        st.markdown('<div class="weather-card">', unsafe_allow_html=True)
-        
-        # Create DataFrame
-        df = pd.DataFrame(hourly_data)
+        st.markdown(templates.SECTION_HEADER.substitute(title='📊 Weather Trends'), unsafe_allow_html=True)
         
-        # Create chart
-        fig = go.Figure()
+        # The key comes from the history's time span and the forecast arrays, so
+        # a cache hit never reads the history rows or rebuilds the figure
+        history = HistoryStore.default()
+        key = ChartPipeline.data_key(history.revision(lat, lon), forecast, theme)
+        figure = UIManager._charts.figure_json(key, lambda: (history.series(lat, lon), forecast), theme)
         
-        fig.add_trace(go.Scatter(
-            x=df['time'],
-            y=df['temp'],
-            mode='lines+markers',
-            name='Temperature',
-            line=dict(color=Config.COLORS['primary'], width=4),
-            marker=dict(size=10, color=Config.COLORS['primary'], symbol='circle'),
-            fill='tozeroy',
-            fillcolor='rgba(26, 115, 232, 0.1)'
-        ))
-        
-        fig.update_layout(
-            title=None,
-            xaxis_title="Time",
-            yaxis_title="Temperature (°C)",
-            plot_bgcolor='rgba(255,255,255,0.95)',
-            paper_bgcolor='rgba(255,255,255,0.95)',
-            height=400,
-            font=dict(size=14),
-            hovermode='x unified',
-            xaxis=dict(
-                showgrid=True,
-                gridcolor='rgba(0,0,0,0.05)',
-                tickangle=0
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridcolor='rgba(0,0,0,0.05)'
-            ),
-            margin=dict(l=40, r=40, t=30, b=40),
-            showlegend=False
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        st.markdown('<div class="weather-card">', unsafe_allow_html=True)
+        # "Auto" lets Streamlit's light/dark theme, which also follows the OS, style the chart
+        st.plotly_chart(json.loads(figure), use_container_width=True, theme="streamlit" if theme == 'Auto' else None)
         
         st.markdown('</div>', unsafe_allow_html=True)
     
@@ -416,66 +242,18 @@ class UIManager:
             
             level = aqi_levels.get(aqi, aqi_levels[3])
             
-            # Display AQI information using Streamlit components
-            st.markdown("""
-            <div style="margin: 30px 0 20px 0;">
-                <h3 style="color: #202124; font-size: 28px; font-weight: 700;">🌬️ Air Quality</h3>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Create two columns
-            col1, col2 = st.columns([1, 2])
-            
-            with col1:
-                # AQI Box
-                st.markdown(f"""
-                <div style="text-align: center; padding: 25px; background: {level['color']}15; 
-                         border-radius: 16px; border-left: 6px solid {level['color']};">
-                    <div style="font-size: 48px; margin-bottom: 15px;">{level['emoji']}</div>
-                    <div style="font-size: 42px; font-weight: 700; color: {level['color']}; margin-bottom: 10px;">
-                        AQI {aqi}
-                    </div>
-                    <div style="color: {Config.COLORS['text_primary']}; font-size: 20px; font-weight: 600;">
-                        {level['label']}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col2:
-                # Health Recommendations Box
-                st.markdown(f"""
-                <div style="padding: 30px; background: rgba(255, 255, 255, 0.9); border-radius: 16px;">
-                    <h4 style="color: #202124; margin-bottom: 15px; font-size: 22px;">
-                        Health Recommendations
-                    </h4>
-                    <p style="color: #202124; margin: 0 0 20px 0; font-size: 16px; line-height: 1.6;">
-                        {level['desc']}
-                    </p>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            # Air Quality Level with Progress Bar
-            st.markdown('<div style="margin-top: 20px;"></div>', unsafe_allow_html=True)
-            
-            # Create a container for AQI level display
-            with st.container():
-                col_label, col_value = st.columns([1, 1])
-                with col_label:
-                    st.markdown('<p style="color: #5f6368; font-weight: 500; margin: 0;">Air Quality Level</p>', unsafe_allow_html=True)
-                with col_value:
-                    st.markdown(f'<p style="color: {level["color"]}; font-weight: 600; margin: 0; text-align: right;">{level["label"]}</p>', unsafe_allow_html=True)
-                
-                # Progress bar
-                progress_html = f"""
-                <div style="background: rgba(0,0,0,0.1); height: 12px; border-radius: 6px; overflow: hidden; margin-top: 10px;">
-                    <div style="width: {(aqi/5)*100}%; height: 100%; background: {level['color']};"></div>
-                </div>
-                """
-                st.markdown(progress_html, unsafe_allow_html=True)
+            # Badge, recommendations and level meter in one element
+            st.markdown(templates.AIR_QUALITY.substitute(
+                header=templates.SECTION_HEADER.substitute(title='🌬️ Air Quality'),
+                color=level['color'],
+                emoji=level['emoji'],
+                aqi=aqi,
+                label=level['label'],
+                description=level['desc'],
+                percent=(aqi / 5) * 100,
+            ), unsafe_allow_html=True)
             
             # Health alerts based on AQI level using Streamlit native components
-            st.markdown('<div style="margin-top: 20px;"></div>', unsafe_allow_html=True)
-            
             if aqi <= 2:
                 st.success("✅ **Good for outdoor activities** - Air quality poses little or no risk.")
             elif aqi == 3:
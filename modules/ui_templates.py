@@ -0,0 +1,129 @@
+from modules.html_renderer import compile_template
+
+# Styling lives in ThemeManager's stylesheet; templates only carry class names
+
+APP_HEADER = compile_template("""
+<div class="app-header">
+    <h1>🌤️ Weather Forecast</h1>
+    <p>Real-time weather updates & forecasts</p>
+</div>
+""")
+
+CLOCK = compile_template("""
+<p class="app-clock">⏰ $time</p>
+""")
+
+FIELD_LABEL = compile_template("""
+<p class="field-label">$label</p>
+""")
+
+SIDEBAR_HEADER = compile_template("""
+<div class="sidebar-title"><h3>$title</h3></div>
+""")
+
+FOOTER = compile_template("""
+<div class="app-footer">
+    <p>🌤️ $app_name v$version • Last updated: $last_update • Location: $location</p>
+    <p class="fine-print">Powered by OpenWeatherMap API • <a href="#">Privacy</a> • <a href="#">Terms</a></p>
+</div>
+""")
+
+SECTION_HEADER = compile_template("""
+<div class="section-title"><h3>$title</h3></div>
+""")
+
+CURRENT_WEATHER = compile_template("""
+<div class="weather-card">
+    <h2 class="current-location">$location</h2>
+    <div class="current-main">
+        <div>
+            <div class="current-temp">$temp°C</div>
+            <p class="current-desc">$description</p>
+        </div>
+        <span class="weather-icon large icon-$icon" role="img" aria-label="$description"></span>
+    </div>
+    <div class="metric-grid">
+        $tiles
+    </div>
+</div>
+""")
+
+METRIC_TILE = compile_template("""
+<div class="metric-tile">
+    <div class="metric-head"><span>$emoji</span><p class="metric-label">$label</p></div>
+    <p class="$value_class">$value</p>
+</div>
+""")
+
+# Each forecast is a single CSS grid, so the whole strip is one element
+HOURLY_FORECAST = compile_template("""
+$header
+<div class="weather-card">
+    <div class="forecast-strip" style="--columns: $count;">
+        $cells
+    </div>
+</div>
+""")
+
+HOURLY_CELL = compile_template("""
+<div class="forecast-cell">
+    <p class="forecast-time">$time</p>
+    <span class="weather-icon icon-$icon" role="img" aria-label="$weather"></span>
+    <p class="forecast-temp">$temp°</p>
+    <p class="forecast-desc">$weather</p>
+</div>
+""")
+
+DAILY_FORECAST = compile_template("""
+$header
+<div class="weather-card">
+    <div class="daily-grid">
+        $rows
+    </div>
+</div>
+""")
+
+DAILY_ROW = compile_template("""
+<div><p class="daily-day">$day</p></div>
+<div><span class="weather-icon icon-$icon" role="img" aria-label="$weather"></span></div>
+<div><p class="daily-weather">$weather</p></div>
+<div>
+    <p class="daily-temp">$temp°C</p>
+    <p class="daily-range">H: $max_temp° • L: $min_temp°</p>
+</div>
+<div>$precipitation</div>
+""")
+
+DAILY_RAIN = compile_template("""
+<p class="daily-precip">🌧️ $precipitation%</p>
+""")
+
+DAILY_DRY = compile_template("""
+<p class="daily-precip dry">☀️ 0%</p>
+""")
+
+# Between days; the stylesheet stretches it across the grid
+DAILY_SEPARATOR = '<hr>'
+
+AIR_QUALITY = compile_template("""
+$header
+<div style="--aqi-color: $color;">
+    <div style="display: grid; grid-template-columns: 1fr 2fr; gap: 20px;">
+        <div class="aqi-badge">
+            <div class="aqi-emoji">$emoji</div>
+            <div class="aqi-value">AQI $aqi</div>
+            <div class="aqi-label">$label</div>
+        </div>
+        <div class="aqi-advice">
+            <h4>Health Recommendations</h4>
+            <p>$description</p>
+        </div>
+    </div>
+    <div class="aqi-level"><span>Air Quality Level</span><span>$label</span></div>
+    <div class="aqi-meter"><div style="width: $percent%;"></div></div>
+</div>
+""")
+
+DATA_AGE = compile_template("""
+<div class="data-age"><span>🕒 Updated $age$status</span></div>
+""")
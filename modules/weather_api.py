@@ -1,49 +1,221 @@
 import requests
 import pandas as pd
+import random
+import threading
+import time
+import itertools
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED, TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
 from geopy.geocoders import Nominatim
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 from config import Config
+from modules.cache_manager import TTLCache, snap_coordinates
+from modules.geocode_cache import GeocodeCache, normalize_query
+from modules.gazetteer import Gazetteer
+from modules.single_flight import SingleFlight
+from modules.rate_limiter import RateLimiter, Ticket, INTERACTIVE, BACKGROUND
+from modules.forecast_engine import aggregate_daily, aggregate_daily_many, forecast_columns
+from modules.forecast_frame import ForecastFrame
+from modules.response_decoder import decode
+from modules.interpolation import interpolate_hourly, interpolate_hourly_many
+
+# One item of a batch call; exactly one of data / error is set
+BatchResult = namedtuple('BatchResult', ['lat', 'lon', 'data', 'error'])
 
 class WeatherAPI:
+    # One pooled session shared by every Streamlit session in the process
+    _session = None
+    _session_lock = threading.Lock()
+    
+    # Cross-session response cache keyed on (endpoint, lat, lon)
+    _cache = TTLCache(max_bytes=Config.CACHE_MAX_BYTES)
+    
+    # Persistent geocoding cache and the pool used for hedged lookups
+    _geocode_cache = GeocodeCache(
+        Config.GEOCODE_CACHE_PATH,
+        ttl=Config.GEOCODE_TTL,
+        negative_ttl=Config.GEOCODE_NEGATIVE_TTL
+    )
+    _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="weather-api")
+    
+    # Concurrent identical upstream calls wait on one in-flight request
+    _flight = SingleFlight()
+    
+    # Token bucket in front of every OpenWeather call, interactive traffic first
+    _rate_limiter = RateLimiter(Config.RATE_LIMIT_PER_MINUTE, Config.RATE_LIMIT_BURST)
+    
+    # Retried in _get, which takes a fresh rate-limiter token for every attempt
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    
+    ENDPOINT_PARAMS = {
+        'weather': {'units': Config.UNITS, 'lang': Config.LANGUAGE},
+        'forecast': {'units': Config.UNITS, 'cnt': 40},
+        'air_pollution': {},
+    }
+    
     def __init__(self):
         self.api_key = Config.OPENWEATHER_API_KEY
         if not self.api_key:
             raise ValueError("OpenWeather API key not found. Add it to .env file")
         
-        self.geolocator = Nominatim(user_agent="weather_forecast_pro", timeout=10)
+        self.geolocator = Nominatim(user_agent="weather_forecast_pro", timeout=Config.HTTP_TIMEOUT)
         self.base_url = "https://api.openweathermap.org/data/2.5"
+        self.session = self.get_session()
+    
+    @classmethod
+    def get_session(cls):
+        """Get the process-wide pooled HTTP session"""
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    cls._session = cls._create_session()
+        return cls._session
+    
+    @staticmethod
+    def _create_session():
+        """Create a keep-alive session with connection pooling and connect retries"""
+        # Only connections that never reached the server are retried here;
+        # OpenWeather responses are retried in _get so each attempt takes a token
+        retry = Retry(
+            total=Config.HTTP_MAX_RETRIES,
+            connect=Config.HTTP_MAX_RETRIES,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=Config.HTTP_BACKOFF_FACTOR,
+            backoff_jitter=Config.HTTP_BACKOFF_JITTER,
+            allowed_methods=frozenset(['GET']),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=Config.HTTP_POOL_SIZE,
+            max_retries=retry
+        )
+        
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+            'User-Agent': f"{Config.APP_NAME.replace(' ', '')}/{Config.APP_VERSION}"
+        })
+        return session
+    
+    @classmethod
+    def cache_stats(cls):
+        """Statistics for the shared response cache"""
+        return cls._cache.stats()
+    
+    @classmethod
+    def rate_limiter_stats(cls):
+        """Queue depth and wait times for the upstream rate limiter"""
+        return cls._rate_limiter.stats()
+    
+    @staticmethod
+    def retry_delay(attempt, retry_after=None):
+        """Jittered exponential backoff before the next attempt, or the server's Retry-After if longer"""
+        delay = Config.HTTP_BACKOFF_FACTOR * (2 ** attempt) + random.uniform(0, Config.HTTP_BACKOFF_JITTER)
+        try:
+            return max(delay, min(float(retry_after), Config.RATE_LIMIT_MAX_WAIT))
+        except (TypeError, ValueError):
+            return delay
+    
+    def _get(self, url, params, priority=INTERACTIVE, ticket=None):
+        """GET an OpenWeather URL with bounded retries, taking a rate-limiter token for every attempt"""
+        # The ticket is re-queued for each retry, keeping its place and any promotion
+        ticket = ticket or Ticket(priority)
+        for attempt in range(Config.HTTP_MAX_RETRIES + 1):
+            last_attempt = attempt == Config.HTTP_MAX_RETRIES
+            self._rate_limiter.acquire(ticket.priority, timeout=Config.RATE_LIMIT_MAX_WAIT, ticket=ticket)
+            retry_after = None
+            try:
+                response = self.session.get(url, params=params, timeout=Config.HTTP_TIMEOUT)
+                if response.status_code not in self.RETRY_STATUSES or last_attempt:
+                    response.raise_for_status()
+                    return response
+                retry_after = response.headers.get('Retry-After')
+            except requests.ReadTimeout:
+                if last_attempt:
+                    raise
+            
+            time.sleep(self.retry_delay(attempt, retry_after))
+    
+    def _fetch(self, endpoint, lat, lon, priority=INTERACTIVE):
+        """Fetch an endpoint for grid-snapped coordinates through the shared cache"""
+        lat, lon = snap_coordinates(lat, lon, Config.CACHE_GRID_DEGREES)
+        key = (endpoint, lat, lon)
+        
+        data = self._cache.get(key)
+        if data is not None:
+            return data
+        
+        return self._fetch_shared(key, priority)
+    
+    def refresh(self, endpoint, lat, lon, priority=BACKGROUND):
+        """Re-fetch an endpoint and replace its cache entry, even if it is still live"""
+        lat, lon = snap_coordinates(lat, lon, Config.CACHE_GRID_DEGREES)
+        key = (endpoint, lat, lon)
+        return self._fetch_shared(key, priority)
+    
+    def _fetch_shared(self, key, priority):
+        """Fetch once per key at a time; a caller joining a queued request lifts it to its own priority"""
+        ticket = Ticket(priority)
+        return self._flight.do(
+            key, self._fetch_upstream, key, priority, ticket,
+            timeout=Config.SINGLE_FLIGHT_TIMEOUT,
+            context=ticket,
+            on_join=lambda leader: self._rate_limiter.promote(leader, priority)
+        )
+    
+    def fetch_async(self, endpoint, lat, lon, priority=INTERACTIVE):
+        """Fetch an endpoint on the shared pool; the Future raises instead of returning sample data"""
+        return self._executor.submit(self._fetch, endpoint, lat, lon, priority)
+    
+    def cached(self, endpoint, lat, lon):
+        """Cached endpoint response for a location, or None; never calls upstream"""
+        lat, lon = snap_coordinates(lat, lon, Config.CACHE_GRID_DEGREES)
+        return self._cache.get((endpoint, lat, lon))
+    
+    def cache_ttl_remaining(self, endpoint, lat, lon):
+        """Seconds until the cached endpoint response for a location expires"""
+        lat, lon = snap_coordinates(lat, lon, Config.CACHE_GRID_DEGREES)
+        return self._cache.ttl_remaining((endpoint, lat, lon))
+    
+    def _fetch_upstream(self, key, priority=INTERACTIVE, ticket=None):
+        """Request an endpoint from OpenWeather and store it in the shared cache"""
+        endpoint, lat, lon = key
+        params = {
+            'lat': lat,
+            'lon': lon,
+            'appid': self.api_key,
+            **self.ENDPOINT_PARAMS[endpoint]
+        }
+        data = decode(endpoint, self._get(f"{self.base_url}/{endpoint}", params, priority, ticket).content)
+        
+        self._cache.set(key, data, Config.CACHE_TTL[endpoint])
+        return data
         
     def get_location_coordinates(self, location_name):
         """Get coordinates for a location"""
         try:
-            # Try with OpenWeather geocoding
-            geo_url = "http://api.openweathermap.org/geo/1.0/direct"
-            params = {
-                'q': location_name,
-                'limit': 1,
-                'appid': self.api_key
-            }
-            
-            response = requests.get(geo_url, params=params, timeout=10)
+            # Known cities resolve from the bundled gazetteer with no round trip
+            known = Gazetteer.default().resolve(location_name)
+            if known:
+                return known
             
-            if response.status_code == 200:
-                data = response.json()
-                if data:
-                    lat = data[0]['lat']
-                    lon = data[0]['lon']
-                    name = data[0].get('name', '')
-                    country = data[0].get('country', '')
-                    address = f"{name}, {country}" if name and country else location_name
-                    return lat, lon, address
-            
-            # Fallback to Nominatim
-            try:
-                location = self.geolocator.geocode(location_name)
-                if location:
-                    return location.latitude, location.longitude, location.address
-            except:
-                pass
+            result = self._flight.do(
+                ('geocode', normalize_query(location_name)),
+                self._geocode,
+                location_name,
+                timeout=Config.SINGLE_FLIGHT_TIMEOUT
+            )
+            if result:
+                return result
             
             return Config.DEFAULT_LAT, Config.DEFAULT_LON, Config.DEFAULT_LOCATION
             
@@ -51,21 +223,78 @@ class WeatherAPI:
             print(f"Location error: {str(e)}")
             return Config.DEFAULT_LAT, Config.DEFAULT_LON, Config.DEFAULT_LOCATION
     
-    def get_current_weather(self, lat, lon):
+    def _geocode(self, location_name):
+        """Resolve a location through the geocode cache, then the network"""
+        cached = self._geocode_cache.get(location_name)
+        if cached is GeocodeCache.NOT_FOUND:
+            return None
+        if cached:
+            return cached
+        
+        result, failed = self._geocode_hedged(location_name)
+        
+        if result:
+            self._geocode_cache.set(location_name, *result)
+        elif not failed:
+            # Only remember "not found" when every provider actually answered
+            self._geocode_cache.set_not_found(location_name)
+        
+        return result
+    
+    def _geocode_hedged(self, location_name):
+        """Query both geocoders concurrently and take the first good answer"""
+        futures = [
+            self._executor.submit(self._geocode_openweather, location_name),
+            self._executor.submit(self._geocode_nominatim, location_name),
+        ]
+        failed = False
+        
+        try:
+            for future in as_completed(futures, timeout=Config.HTTP_TIMEOUT):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Geocoding error: {str(e)}")
+                    failed = True
+                    continue
+                
+                if result:
+                    return result, False
+        except FutureTimeoutError:
+            print(f"Geocoding timed out for {location_name}")
+            failed = True
+        
+        return None, failed
+    
+    def _geocode_openweather(self, location_name):
+        """Resolve a location with OpenWeather geocoding"""
+        geo_url = "https://api.openweathermap.org/geo/1.0/direct"
+        params = {
+            'q': location_name,
+            'limit': 1,
+            'appid': self.api_key
+        }
+        
+        data = self._get(geo_url, params).json()
+        if not data:
+            return None
+        
+        name = data[0].get('name', '')
+        country = data[0].get('country', '')
+        address = f"{name}, {country}" if name and country else location_name
+        return data[0]['lat'], data[0]['lon'], address
+    
+    def _geocode_nominatim(self, location_name):
+        """Resolve a location with Nominatim"""
+        location = self.geolocator.geocode(location_name)
+        if not location:
+            return None
+        return location.latitude, location.longitude, location.address
+    
+    def get_current_weather(self, lat, lon, priority=INTERACTIVE):
         """Get current weather data"""
         try:
-            url = f"{self.base_url}/weather"
-            params = {
-                'lat': lat,
-                'lon': lon,
-                'appid': self.api_key,
-                'units': Config.UNITS,
-                'lang': Config.LANGUAGE
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            return self._fetch('weather', lat, lon, priority)
             
         except requests.exceptions.RequestException as e:
             print(f"Weather API error: {str(e)}")
@@ -74,115 +303,90 @@ class WeatherAPI:
             print(f"Unexpected error: {str(e)}")
             return self._get_sample_data()
     
-    def get_forecast(self, lat, lon):
+    def get_forecast(self, lat, lon, priority=INTERACTIVE):
         """Get 5-day forecast"""
         try:
-            url = f"{self.base_url}/forecast"
-            params = {
-                'lat': lat,
-                'lon': lon,
-                'appid': self.api_key,
-                'units': Config.UNITS,
-                'cnt': 40
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            return self._fetch('forecast', lat, lon, priority)
             
         except:
             return None
     
-    def get_7_hour_forecast(self, forecast_data):
-        """Get 7-hour forecast data"""
-        if not forecast_data:
-            return self._get_7_hour_sample_data()
-        
-        hourly_data = []
+    def get_current_weather_many(self, coordinates, max_concurrency=None, priority=BACKGROUND):
+        """Stream current weather for many (lat, lon) pairs as BatchResults"""
+        return self._fetch_many('weather', coordinates, max_concurrency, priority)
+    
+    def get_forecast_many(self, coordinates, max_concurrency=None, priority=BACKGROUND):
+        """Stream forecasts for many (lat, lon) pairs as BatchResults"""
+        return self._fetch_many('forecast', coordinates, max_concurrency, priority)
+    
+    def _fetch_many(self, endpoint, coordinates, max_concurrency=None, priority=BACKGROUND):
+        """Fetch an endpoint for many locations with bounded concurrency, yielding in completion order"""
+        max_concurrency = max_concurrency or Config.BATCH_MAX_CONCURRENCY
+        coordinates = iter(coordinates)
         
-        for item in forecast_data['list'][:7]:
-            dt = datetime.fromtimestamp(item['dt'])
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="weather-batch") as executor:
+            pending = {}
             
-            hour_str = dt.strftime('%I %p').lstrip('0')
-            if hour_str.startswith(' '):
-                hour_str = hour_str[1:]
+            def submit(batch):
+                for lat, lon in batch:
+                    pending[executor.submit(self._fetch, endpoint, lat, lon, priority)] = (lat, lon)
             
-            hourly_data.append({
-                'time': hour_str,
-                'temp': round(item['main']['temp']),
-                'icon': item['weather'][0]['icon'],
-                'weather': item['weather'][0]['main'],
-                'humidity': item['main']['humidity'],
-                'wind_speed': round(item['wind']['speed'], 1),
-            })
+            # Only max_concurrency requests are queued at a time so huge inputs stream
+            submit(itertools.islice(coordinates, max_concurrency))
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    lat, lon = pending.pop(future)
+                    try:
+                        yield BatchResult(lat, lon, future.result(), None)
+                    except Exception as e:
+                        yield BatchResult(lat, lon, None, e)
+                submit(itertools.islice(coordinates, len(done)))
+    
+    def get_7_hour_forecast(self, forecast_data, current_weather=None):
+        """Get a true hourly 7-hour forecast interpolated from the 3-hourly series"""
+        if not forecast_data:
+            return self._get_7_hour_sample_data()
         
-        return hourly_data
+        frame = ForecastFrame.from_response(forecast_data)
+        if len(frame) == 0:
+            return self._get_7_hour_sample_data()
+        
+        return interpolate_hourly(frame, current_weather, hours=7)
+    
+    def get_7_hour_forecast_many(self, forecasts, current_weathers=None):
+        """Hourly forecasts for many locations in one vectorized pass"""
+        frames = [ForecastFrame.from_response(data) for data in forecasts]
+        return interpolate_hourly_many(frames, current_weathers, hours=7)
     
     def get_daily_forecast_data(self, forecast_data):
-        """Process daily forecast data"""
+        """Process daily forecast data, bucketed by the city's local day"""
         if not forecast_data:
             return self._get_sample_daily_data()
         
-        daily_data = {}
-        
-        for item in forecast_data['list']:
-            date_str = datetime.fromtimestamp(item['dt']).strftime('%Y-%m-%d')
-            if date_str not in daily_data:
-                daily_data[date_str] = {
-                    'temps': [],
-                    'weather': [],
-                    'icons': [],
-                    'pop': []
-                }
-            
-            daily_data[date_str]['temps'].append(item['main']['temp'])
-            daily_data[date_str]['weather'].append(item['weather'][0]['main'])
-            daily_data[date_str]['icons'].append(item['weather'][0]['icon'])
-            daily_data[date_str]['pop'].append(item.get('pop', 0) * 100)
-        
-        processed_data = []
-        dates = list(daily_data.keys())[:7]
-        
-        for date_str in dates:
-            data = daily_data[date_str]
-            day_name = datetime.strptime(date_str, '%Y-%m-%d').strftime('%a')
-            avg_temp = sum(data['temps']) / len(data['temps'])
-            max_temp = max(data['temps'])
-            min_temp = min(data['temps'])
-            
-            weather = max(set(data['weather']), key=data['weather'].count) if data['weather'] else 'Clear'
-            icon = max(set(data['icons']), key=data['icons'].count) if data['icons'] else '01d'
-            
-            processed_data.append({
-                'date': date_str,
-                'day': day_name,
-                'temp': round(avg_temp),
-                'max_temp': round(max_temp),
-                'min_temp': round(min_temp),
-                'weather': weather,
-                'icon': icon,
-                'precipitation': round(max(data['pop'])) if data['pop'] else 0,
-            })
-        
-        return processed_data
+        return aggregate_daily(forecast_data)
     
-    def get_air_quality(self, lat, lon):
+    def get_daily_forecast_data_many(self, forecasts):
+        """Process many locations' forecasts in one vectorized pass"""
+        columns = [forecast_columns(data) for data in forecasts if data]
+        results = iter(aggregate_daily_many(columns))
+        return [next(results) if data else self._get_sample_daily_data() for data in forecasts]
+    
+    def get_air_quality(self, lat, lon, priority=INTERACTIVE):
         """Get air quality data"""
         try:
-            url = f"{self.base_url}/air_pollution"
-            params = {
-                'lat': lat,
-                'lon': lon,
-                'appid': self.api_key
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            return self._fetch('air_pollution', lat, lon, priority)
         except:
             return None
     
-    def _get_sample_data(self):
+    @staticmethod
+    def is_sample(data):
+        """True for the placeholder returned when the current-weather call failed"""
+        return isinstance(data, dict) and data.get('sample', False)
+    
+    @staticmethod
+    def _get_sample_data():
         """Return sample data for testing"""
         return {
             'weather': [{'main': 'Overcast Clouds', 'description': 'overcast clouds', 'icon': '04d'}],
@@ -201,31 +405,30 @@ class WeatherAPI:
                 'sunset': int(datetime.now().replace(hour=18, minute=30, second=0).timestamp())
             },
             'visibility': 800,
-            'name': 'Mumbai'
+            'name': 'Mumbai',
+            'sample': True
         }
     
-    def _get_7_hour_sample_data(self):
+    @staticmethod
+    def _get_7_hour_sample_data():
         """Return sample 7-hour data"""
-        base_time = datetime.now()
-        sample_data = []
-        
-        for i in range(7):
-            time_delta = timedelta(hours=i)
-            dt = base_time + time_delta
-            hour_str = dt.strftime('%I %p').lstrip('0')
-            
-            sample_data.append({
-                'time': hour_str,
-                'temp': 26 + (i % 2),
-                'icon': '04d' if i < 4 else '01d',
-                'weather': 'Clouds' if i < 4 else 'Clear',
-                'humidity': 80 - i*5,
-                'wind_speed': 3.5 + i/2,
-            })
+        base_time = int(datetime.now().timestamp())
         
-        return sample_data
+        return ForecastFrame.from_response({
+            'city': {'timezone': int(datetime.now().astimezone().utcoffset().total_seconds())},
+            'list': [
+                {
+                    'dt': base_time + i * 3600,
+                    'main': {'temp': 26 + (i % 2), 'humidity': 80 - i*5},
+                    'weather': [{'main': 'Clouds' if i < 4 else 'Clear', 'icon': '04d' if i < 4 else '01d'}],
+                    'wind': {'speed': 3.5 + i/2},
+                }
+                for i in range(7)
+            ]
+        })
     
-    def _get_sample_daily_data(self):
+    @staticmethod
+    def _get_sample_daily_data():
         """Return sample daily data"""
         base_date = datetime.now()
         sample_data = []
@@ -0,0 +1,203 @@
+import base64
+import io
+import math
+import numpy as np
+from config import Config
+from modules.cache_manager import TTLCache
+from modules.rate_limiter import INTERACTIVE
+
+try:
+    from PIL import Image
+except ImportError:  # optional; without Pillow no overlay is drawn
+    Image = None
+
+# (value, RGBA) stops for each field
+COLORMAPS = {
+    'temp': [
+        (-10, (49, 54, 149, 170)),
+        (0, (69, 117, 180, 160)),
+        (10, (116, 173, 209, 150)),
+        (20, (254, 224, 144, 150)),
+        (30, (244, 109, 67, 160)),
+        (40, (165, 0, 38, 170)),
+    ],
+    'precip': [
+        (0.0, (65, 105, 225, 0)),
+        (0.5, (65, 105, 225, 90)),
+        (2.0, (30, 80, 200, 150)),
+        (5.0, (20, 40, 160, 190)),
+        (10.0, (90, 20, 140, 210)),
+    ],
+}
+
+FIELD_NAMES = {'temp': 'Temperature', 'precip': 'Precipitation'}
+
+
+def field_value(field, weather_data):
+    """The reading a field shows for one /weather response"""
+    if field == 'temp':
+        return weather_data['main']['temp']
+    rain = weather_data.get('rain') or {}
+    return rain.get('1h', rain.get('3h', 0.0) / 3)
+
+
+def tile_lon(x, z):
+    return np.asarray(x, dtype=np.float64) / 2 ** z * 360.0 - 180.0
+
+
+def tile_lat(y, z):
+    n = np.pi - 2.0 * np.pi * np.asarray(y, dtype=np.float64) / 2 ** z
+    return np.degrees(np.arctan(np.sinh(n)))
+
+
+def tile_xy(lat, lon, z):
+    """Fractional Web Mercator tile coordinates of a point"""
+    lat = max(min(lat, 85.0511), -85.0511)
+    n = 2 ** z
+    x = (lon + 180.0) / 360.0 * n
+    y = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+    return x, y
+
+
+def fill_missing(grid):
+    """Fill NaN samples by inverse-distance weighting from the known ones"""
+    known = ~np.isnan(grid)
+    if known.all() or not known.any():
+        return grid
+    rows, cols = np.indices(grid.shape)
+    d2 = (rows[~known][:, None] - rows[known][None, :]) ** 2 + (cols[~known][:, None] - cols[known][None, :]) ** 2
+    weights = 1.0 / d2
+    filled = grid.copy()
+    filled[~known] = (weights * grid[known][None, :]).sum(axis=1) / weights.sum(axis=1)
+    return filled
+
+
+def bilinear(grid, size):
+    """Upsample a (k+1, k+1) sample grid to size x size pixels spanning the same square"""
+    k = grid.shape[0] - 1
+    u = (np.arange(size) + 0.5) / size * k
+    i0 = np.clip(np.floor(u).astype(int), 0, k - 1)
+    f = u - i0
+    top = grid[i0][:, i0] * (1 - f)[None, :] + grid[i0][:, i0 + 1] * f[None, :]
+    bottom = grid[i0 + 1][:, i0] * (1 - f)[None, :] + grid[i0 + 1][:, i0 + 1] * f[None, :]
+    return top * (1 - f)[:, None] + bottom * f[:, None]
+
+
+def colorize(field, values):
+    """RGBA uint8 image for a 2-D array of field values"""
+    stops = COLORMAPS[field]
+    levels = [value for value, _ in stops]
+    rgba = np.empty(values.shape + (4,), dtype=np.uint8)
+    for channel in range(4):
+        rgba[..., channel] = np.interp(values, levels, [color[channel] for _, color in stops])
+    rgba[np.isnan(values)] = 0
+    return rgba
+
+
+class WeatherField:
+    """Interpolated weather raster over the map view, built from cached point samples"""
+
+    # Computed rasters keyed by (field, z, x, y), shared by every session
+    _tiles = TTLCache(max_bytes=Config.FIELD_CACHE_MAX_BYTES)
+
+    def __init__(self, weather_api, samples_per_tile=None, tile_pixels=None, fetch_limit=None):
+        self.weather_api = weather_api
+        self.samples_per_tile = samples_per_tile or Config.FIELD_SAMPLES_PER_TILE
+        self.tile_pixels = tile_pixels or Config.FIELD_TILE_PIXELS
+        self.fetch_limit = Config.FIELD_FETCH_LIMIT if fetch_limit is None else fetch_limit
+
+    @staticmethod
+    def field_zoom(map_zoom):
+        """Coarser tiles than the map's, so a view needs only a handful of samples"""
+        return max(map_zoom - Config.FIELD_ZOOM_OFFSET, 1)
+
+    @staticmethod
+    def visible_tiles(lat, lon, map_zoom, viewport=None):
+        """Field tiles covering the map viewport around a center point"""
+        width, height = viewport or (Config.FIELD_VIEWPORT_WIDTH, Config.MAP_HEIGHT)
+        z = WeatherField.field_zoom(map_zoom)
+        cx, cy = tile_xy(lat, lon, z)
+        # Viewport half-size in field tiles: 256 px per tile at map zoom, scaled down
+        scale = 2 ** (z - map_zoom) / 256.0
+        n = 2 ** z
+        x0, x1 = int(math.floor(cx - width / 2 * scale)), int(math.floor(cx + width / 2 * scale))
+        y0, y1 = int(math.floor(cy - height / 2 * scale)), int(math.floor(cy + height / 2 * scale))
+        return z, (max(x0, 0), min(x1, n - 1)), (max(y0, 0), min(y1, n - 1))
+
+    def _lattice(self, z, x, y):
+        """Sample points of one tile; edges match the neighbors' so their samples are shared"""
+        steps = np.arange(self.samples_per_tile + 1) / self.samples_per_tile
+        lats = np.round(tile_lat(y + steps, z), 4)
+        lons = np.round(tile_lon(x + steps, z), 4)
+        return lats, lons
+
+    def _sample(self, field, points):
+        """Field value per (lat, lon): cached readings first, then a bounded batch fetch"""
+        values = {}
+        missing = []
+        for lat, lon in points:
+            data = self.weather_api.cached('weather', lat, lon)
+            if data is not None:
+                values[(lat, lon)] = field_value(field, data)
+            else:
+                missing.append((lat, lon))
+
+        # Drawn while the page waits, so these queue ahead of prefetching
+        for result in self.weather_api.get_current_weather_many(missing[:self.fetch_limit], priority=INTERACTIVE):
+            if result.data is not None:
+                values[(result.lat, result.lon)] = field_value(field, result.data)
+        return values
+
+    def _render_tile(self, field, grid):
+        values = bilinear(fill_missing(grid), self.tile_pixels)
+        return colorize(field, values)
+
+    def raster(self, field, z, xs, ys):
+        """RGBA mosaic for a block of tiles; complete tiles are cached for later views"""
+        tiles = {}
+        pending = {}
+        for x in range(xs[0], xs[1] + 1):
+            for y in range(ys[0], ys[1] + 1):
+                cached = self._tiles.get((field, z, x, y))
+                if cached is not None:
+                    tiles[(x, y)] = cached
+                else:
+                    pending[(x, y)] = self._lattice(z, x, y)
+
+        if pending:
+            points = {(float(lat), float(lon)) for lats, lons in pending.values() for lat in lats for lon in lons}
+            values = self._sample(field, sorted(points))
+
+            for (x, y), (lats, lons) in pending.items():
+                grid = np.array([[values.get((float(lat), float(lon)), np.nan) for lon in lons] for lat in lats])
+                if np.isnan(grid).all():
+                    tiles[(x, y)] = np.zeros((self.tile_pixels, self.tile_pixels, 4), dtype=np.uint8)
+                    continue
+                tiles[(x, y)] = self._render_tile(field, grid)
+                # Tiles built from partial samples are redrawn once more readings are cached
+                if not np.isnan(grid).any():
+                    self._tiles.set((field, z, x, y), tiles[(x, y)], Config.CACHE_TTL['weather'])
+
+        rows = [
+            np.concatenate([tiles[(x, y)] for x in range(xs[0], xs[1] + 1)], axis=1)
+            for y in range(ys[0], ys[1] + 1)
+        ]
+        return np.concatenate(rows, axis=0)
+
+    def overlay(self, field, lat, lon, map_zoom=None):
+        """(PNG data URI, [[south, west], [north, east]]) for the view around a point, or None"""
+        if Image is None or field not in COLORMAPS:
+            return None
+
+        z, xs, ys = self.visible_tiles(lat, lon, map_zoom or Config.MAP_ZOOM)
+        image = self.raster(field, z, xs, ys)
+        if not image[..., 3].any():
+            return None
+
+        buffer = io.BytesIO()
+        Image.fromarray(image, 'RGBA').save(buffer, format='PNG', optimize=True)
+        data_uri = f"data:image/png;base64,{base64.b64encode(buffer.getvalue()).decode('ascii')}"
+
+        south, north = float(tile_lat(ys[1] + 1, z)), float(tile_lat(ys[0], z))
+        west, east = float(tile_lon(xs[0], z)), float(tile_lon(xs[1] + 1, z))
+        return data_uri, [[south, west], [north, east]]
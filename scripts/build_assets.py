@@ -0,0 +1,49 @@
+"""Build the resized, content-hashed background variants into static/.
+
+Run from the repository root before deploying:
+
+    python scripts/build_assets.py
+
+The app builds missing variants on first start as well, but that takes a
+while and the remote background is shown until it finishes.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.asset_pipeline import AssetPipeline
+
+
+def main():
+    pipeline = AssetPipeline()
+    formats = pipeline.formats()
+    if not formats:
+        print("Pillow with WebP or AVIF support is required")
+        return 1
+
+    started = time.perf_counter()
+    manifest = pipeline.build()
+    elapsed = time.perf_counter() - started
+
+    source_bytes = sum(
+        os.path.getsize(os.path.join(pipeline.source_dir, name)) for name in pipeline.sources()
+    )
+    print(f"{len(manifest)} backgrounds, formats {', '.join(formats)}, built in {elapsed:.1f}s")
+    print(f"{'width':>6} " + ' '.join(f"{fmt + ' KB':>10}" for fmt in formats))
+    for width in pipeline.widths:
+        sizes = []
+        for fmt in formats:
+            total = sum(
+                os.path.getsize(os.path.join(pipeline.output_dir, variants[fmt][str(width)]))
+                for variants in manifest.values() if str(width) in variants.get(fmt, {})
+            )
+            sizes.append(total / max(len(manifest), 1) / 1024)
+        print(f"{width:>6} " + ' '.join(f"{size:>10.1f}" for size in sizes))
+    print(f"source JPEG average: {source_bytes / max(len(manifest), 1) / 1024:.1f} KB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Build data/cities.tsv and data/countries.tsv from a GeoNames dump.
+
+Download cities15000.zip and countryInfo.txt from
+https://download.geonames.org/export/dump/ and run:
+
+    python scripts/build_gazetteer.py cities15000.txt countryInfo.txt
+"""
+import argparse
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_cities(source, target, min_population):
+    rows = []
+    with open(source, encoding='utf-8') as f:
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            # geonameid, name, asciiname, alternatenames, lat, lon, ..., country code (8), ..., population (14)
+            population = int(fields[14] or 0)
+            if population < min_population:
+                continue
+            rows.append((fields[2] or fields[1], fields[8], float(fields[4]), float(fields[5]), population))
+
+    rows.sort(key=lambda row: -row[4])
+    with open(target, 'w', encoding='utf-8') as f:
+        f.write("# name\tcountry\tlat\tlon\tpopulation\n")
+        for name, country, lat, lon, population in rows:
+            f.write(f"{name}\t{country}\t{lat:.4f}\t{lon:.4f}\t{population}\n")
+    return len(rows)
+
+
+def build_countries(source, target):
+    count = 0
+    with open(source, encoding='utf-8') as src, open(target, 'w', encoding='utf-8') as f:
+        f.write("# code\tname\n")
+        for line in src:
+            if line.startswith('#'):
+                continue
+            fields = line.rstrip('\n').split('\t')
+            f.write(f"{fields[0]}\t{fields[4]}\n")
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('cities', help="GeoNames cities file, e.g. cities15000.txt")
+    parser.add_argument('countries', nargs='?', help="GeoNames countryInfo.txt")
+    parser.add_argument('--min-population', type=int, default=15000)
+    args = parser.parse_args()
+
+    count = build_cities(args.cities, os.path.join(ROOT, 'data', 'cities.tsv'), args.min_population)
+    print(f"Wrote {count} cities")
+
+    if args.countries:
+        count = build_countries(args.countries, os.path.join(ROOT, 'data', 'countries.tsv'))
+        print(f"Wrote {count} countries")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Download the map's JavaScript/CSS libraries into static/vendor/.
+
+Run from the repository root before deploying:
+
+    python scripts/fetch_vendor.py
+
+Fetches every script and stylesheet folium loads (Leaflet, jQuery,
+Bootstrap, Font Awesome, awesome-markers and the marker cluster plugin),
+plus the fonts and images their stylesheets reference. It then writes a
+manifest mapping each CDN URL to its local copy. MapManager serves the
+local copies when the manifest exists and falls back to the CDN otherwise.
+"""
+import json
+import os
+import re
+import sys
+from urllib.parse import urljoin, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import folium
+from folium.plugins import FastMarkerCluster
+from config import Config
+from modules.weather_api import WeatherAPI
+
+CSS_URL = re.compile(r'url\(\s*[\'"]?([^\'")]+)[\'"]?\s*\)')
+
+
+def library_urls():
+    """Every CDN asset the map templates reference"""
+    urls = []
+    for element in (folium.Map, FastMarkerCluster):
+        for _, url in getattr(element, 'default_js', []) + getattr(element, 'default_css', []):
+            if url not in urls:
+                urls.append(url)
+    return urls
+
+
+def local_path(url):
+    parsed = urlparse(url)
+    return os.path.join(parsed.netloc, parsed.path.lstrip('/'))
+
+
+def download(session, url, vendor_dir):
+    target = os.path.join(vendor_dir, local_path(url))
+    if os.path.exists(target):
+        with open(target, 'rb') as f:
+            return f.read()
+
+    response = session.get(url, timeout=Config.HTTP_TIMEOUT)
+    response.raise_for_status()
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as f:
+        f.write(response.content)
+    print(f"  {url} ({len(response.content) / 1024:.1f} KB)")
+    return response.content
+
+
+def main():
+    vendor_dir = Config.VENDOR_DIR
+    session = WeatherAPI.get_session()
+    manifest = {}
+
+    for url in library_urls():
+        content = download(session, url, vendor_dir)
+        manifest[url] = local_path(url).replace(os.sep, '/')
+
+        # Fonts and images referenced from stylesheets keep their relative layout
+        if url.endswith('.css'):
+            for ref in set(CSS_URL.findall(content.decode('utf-8', 'replace'))):
+                if ref.startswith(('data:', '#')):
+                    continue
+                asset = urljoin(url, ref.split('#')[0].split('?')[0])
+                try:
+                    download(session, asset, vendor_dir)
+                except Exception as e:
+                    print(f"  skipped {asset}: {str(e)}")
+
+    with open(os.path.join(vendor_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    print(f"{len(manifest)} libraries in {vendor_dir}")
+
+
+if __name__ == '__main__':
+    main()
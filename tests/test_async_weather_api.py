@@ -0,0 +1,48 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from config import Config
+from modules.async_weather_api import AsyncWeatherAPI, BackgroundLoop
+
+
+class StubWeather(BaseHTTPRequestHandler):
+    """Answers every /weather request with a fixed city"""
+
+    def do_GET(self):
+        body = json.dumps({
+            'name': 'Stubville',
+            'main': {'temp': 21.0, 'humidity': 50},
+            'weather': [{'main': 'Clear', 'description': 'clear sky', 'icon': '01d'}],
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubWeather)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(Config, 'OPENWEATHER_API_KEY', Config.OPENWEATHER_API_KEY or 'test')
+
+    api = AsyncWeatherAPI()
+    api.base_url = f"http://127.0.0.1:{server.server_port}"
+    yield api
+    server.shutdown()
+
+
+def test_loops_run_one_after_the_other(api):
+    # Distinct coordinates so every call reaches the stub instead of the shared cache
+    first = asyncio.run(api.get_current_weather(-41.11, 101.11))
+    second = asyncio.run(api.get_current_weather(-41.22, 101.22))
+    third = BackgroundLoop.default().run(api.get_current_weather(-41.33, 101.33), timeout=30)
+
+    assert [data['name'] for data in (first, second, third)] == ['Stubville'] * 3